@@ -0,0 +1,449 @@
+#!/usr/bin/python
+"""Rules to apply NumPy_ functions (besides ufuncs) to quantities
+
+:meth:`natu.core.Quantity.__array_function__` calls :func:`apply`, which looks
+up the rule and the dimensioned parameters of the function.  The rule checks
+the dimensions of those arguments and determines the dimension and display unit
+of the result once per call.  The function itself is applied to the values, so
+whole-array operations stay vectorized.  Numbers and arrays are considered
+dimensionless.  A function without a rule isn't supported for quantities;
+NumPy_ raises a :class:`TypeError`.
+
+These are the rules (see also :mod:`natu._ufuncs`):
+
+- *same*: The dimensioned arguments must have the same dimension.  The result
+  (or each item of it, if it is a list or tuple) has the dimension and display
+  unit of the first quantity (e.g., :func:`numpy.sum`, :func:`numpy.mean`,
+  :func:`numpy.concatenate`, :func:`numpy.clip`).
+
+- *each*: Each item of the result has the dimension and display unit of the
+  corresponding argument (e.g., :func:`numpy.meshgrid`).
+
+- *compare*: The dimensioned arguments must have the same dimension, and the
+  result is not a quantity (e.g., :func:`numpy.allclose`).
+
+- *value*: The arguments may have any dimension, and the result is not a
+  quantity (e.g., :func:`numpy.argmax`, :func:`numpy.shape`).
+
+- *dimensionless*: The arguments must be dimensionless, and the result is not a
+  quantity (e.g., :func:`numpy.cumprod`).
+
+- *square*: The dimension and display unit are doubled (e.g.,
+  :func:`numpy.var`).
+
+- *product*: The dimensions and display units of the arguments are added (e.g.,
+  :func:`numpy.dot`, :func:`numpy.einsum`).
+
+- *prod*: The dimension and display unit are multiplied by the number of
+  factors (:func:`numpy.prod`).
+
+- *gradient*, *trapezoid*, *interp*, and *average*: The rules are specific to
+  the functions.  The spacing divides the dimension of the result of
+  :func:`numpy.gradient`, and it multiplies the dimension of the result of
+  :func:`numpy.trapezoid`.  The result of :func:`numpy.interp` has the
+  dimension of *fp*, and the points (*x*, *xp*, and *period*) must have the
+  same dimension.  The weights of :func:`numpy.average` may have any dimension.
+
+As for :mod:`natu._ufuncs`, a dimensionless result of a product is returned as
+a number or array.
+
+.. _NumPy: http://numpy.scipy.org/
+"""
+# pylint: disable=I0011, C0103, W0212
+
+import numpy as np
+
+from .core import DIMENSIONLESS, Quantity
+from ._ufuncs import _dimension, _first_quantity, _value
+
+# Parameters that may be dimensioned, as (position, name) pairs
+#
+# A position of None means that the parameter is keyword-only.  A name of '*'
+# means that all of the positional arguments from the position onward are
+# included (e.g., *args).  A name starting with '*' means that the argument is
+# a sequence of arrays.
+_A = ((0, 'a'),)
+_AB = ((0, 'a'), (1, 'b'))
+_AV = ((0, 'a'), (1, 'v'))
+_ARR = ((0, 'arr'),)
+_ARRAYS = ((0, '*arrays'),)
+_TUP = ((0, '*tup'),)
+_X = ((0, 'x'),)
+
+# Rules and dimensioned parameters, by name of function
+_SPECS = [
+    ('same', _A, 'sum nansum mean nanmean median nanmedian max amax min amin '
+                 'nanmax nanmin ptp std nanstd cumsum nancumsum sort '
+                 'partition sort_complex round around reshape ravel transpose '
+                 'squeeze expand_dims flip roll moveaxis swapaxes copy take '
+                 'repeat resize diagonal trace tril triu percentile '
+                 'nanpercentile quantile nanquantile zeros_like empty_like '
+                 'split array_split hsplit vsplit dsplit'),
+    ('same', ((0, 'A'),), 'tile'),
+    ('same', ((0, 'm'),), 'fliplr flipud rot90'),
+    ('same', ((0, 'v'),), 'diag'),
+    ('same', ((0, 'val'),), 'real imag'),
+    ('same', ((0, 'filt'),), 'trim_zeros'),
+    ('same', ((0, 'array'),), 'broadcast_to'),
+    ('same', _X, 'fix nan_to_num linalg.norm'),
+    ('same', _ARR, 'delete'),
+    ('same', _ARRAYS, 'concatenate stack'),
+    ('same', _TUP, 'vstack hstack dstack column_stack row_stack'),
+    ('same', ((0, 'a'), (1, 'a_min'), (2, 'a_max'), (None, 'min'),
+              (None, 'max')), 'clip'),
+    ('same', ((0, 'a'), (None, 'prepend'), (None, 'append')), 'diff'),
+    ('same', ((0, 'ary'), (1, 'to_end'), (2, 'to_begin')), 'ediff1d'),
+    ('same', ((1, 'x'), (2, 'y')), 'where'),
+    ('same', ((0, 'a'), (1, 'fill_value')), 'full_like'),
+    ('same', ((0, 'start'), (1, 'stop')), 'linspace'),
+    ('same', ((0, 'arr'), (2, 'values')), 'insert'),
+    ('same', ((0, 'arr'), (1, 'values')), 'append'),
+    ('same', ((0, 'ar'),), 'unique'),
+    ('each', ((0, '*'),), 'atleast_1d atleast_2d atleast_3d broadcast_arrays '
+                          'meshgrid'),
+    ('compare', ((0, 'a'), (1, 'b'), (3, 'atol')), 'allclose isclose'),
+    ('compare', ((0, 'a1'), (1, 'a2')), 'array_equal array_equiv'),
+    ('compare', _AV, 'searchsorted'),
+    ('compare', ((0, 'element'), (1, 'test_elements')), 'isin'),
+    ('value', _A, 'shape ndim size argmax argmin nanargmax nanargmin argsort '
+                  'argpartition argwhere nonzero count_nonzero flatnonzero '
+                  'iscomplexobj isrealobj'),
+    ('value', _X, 'iscomplex isreal'),
+    ('dimensionless', _A, 'cumprod nancumprod'),
+    ('square', _A, 'var nanvar'),
+    ('product', _AB, 'dot vdot inner outer cross kron tensordot'),
+    ('product', _AV, 'convolve correlate'),
+    ('product', ((1, '*'),), 'einsum'),
+    ('prod', _A, 'prod nanprod'),
+    ('gradient', ((0, 'f'), (1, '*')), 'gradient'),
+    ('trapezoid', ((0, 'y'), (1, 'x'), (2, 'dx')), 'trapezoid trapz'),
+    ('interp', ((0, 'x'), (1, 'xp'), (2, 'fp'), (3, 'left'), (4, 'right'),
+                (5, 'period')), 'interp'),
+    ('average', ((0, 'a'), (2, 'weights')), 'average'),
+]
+
+# Rules and dimensioned parameters, by function
+_FUNCTIONS = {}
+for _rule, _params, _names in _SPECS:
+    for _name in _names.split():
+        _func = np
+        for _attr in _name.split('.'):
+            _func = getattr(_func, _attr, None)
+        if _func is not None: # The function isn't in all versions of NumPy.
+            _FUNCTIONS[_func] = (_rule, _params)
+del _SPECS, _rule, _params, _names, _name, _func, _attr
+
+
+def apply(func, types, args, kwargs):
+    """Apply a NumPy_ function to arguments that include quantities.
+
+    **Parameters:**
+
+    - *func*: The function (e.g., :func:`numpy.sum`)
+
+    - *types*: Types of the arguments that implement
+      :meth:`__array_function__`
+
+    - *args*: Tuple of the positional arguments
+
+    - *kwargs*: Dictionary of the keyword arguments
+
+    **Returns:** The result or :const:`NotImplemented` if the function or the
+    arguments aren't supported
+
+    **Example:**
+
+    >>> import numpy as np
+    >>> from natu.units import m, s
+    >>> x = np.array([1, 2, 3, 4])*m
+    >>> print(np.mean(x))
+    2.5 m
+    >>> print(np.var(x))
+    1.25 m2
+    >>> print(np.concatenate([x, np.array([5])*m]))
+    [1. 2. 3. 4. 5.] m
+    >>> print(np.gradient(x, 2*s))
+    [0.5 0.5 0.5 0.5] m/s
+    >>> np.concatenate([x, np.array([5])*s])
+    Traceback (most recent call last):
+    ...
+    TypeError: concatenate requires arguments with the same dimension.
+    """
+    try:
+        rule, params = _FUNCTIONS[func]
+    except KeyError:
+        return NotImplemented
+    if not all(issubclass(t, (Quantity, np.ndarray)) for t in types):
+        return NotImplemented
+    args, kwargs, quantities = _extract(args, kwargs, params)
+    if _contains_quantity(args) or _contains_quantity(kwargs.values()):
+        # A quantity was passed to a parameter that isn't dimensioned.
+        return NotImplemented
+    return _RULES[rule](func, args, kwargs, quantities)
+
+
+def _extract(args, kwargs, params):
+    """Replace the dimensioned arguments with their values.
+
+    Return the positional arguments, the keyword arguments, and a list of the
+    dimensioned arguments in the order of *params*.  The list has *None* for
+    each argument that wasn't given and each item of a sequence argument.
+    """
+    args = list(args)
+    kwargs = dict(kwargs)
+    quantities = []
+    for position, name in params:
+        if name == '*':
+            quantities += args[position:]
+            args[position:] = [_value(x) for x in args[position:]]
+            continue
+        if position is not None and position < len(args):
+            container, key = args, position
+        elif name.lstrip('*') in kwargs:
+            container, key = kwargs, name.lstrip('*')
+        else:
+            quantities.append(None)
+            continue
+        arg = container[key]
+        if name.startswith('*'):
+            quantities += list(arg)
+            container[key] = [_value(x) for x in arg]
+        else:
+            quantities.append(arg)
+            container[key] = _value(arg)
+    return args, kwargs, quantities
+
+
+def _contains_quantity(args):
+    """Return *True* if any argument is a quantity or a list or tuple that
+    contains a quantity.
+    """
+    for arg in args:
+        if isinstance(arg, Quantity):
+            return True
+        if isinstance(arg, (list, tuple)) and any(isinstance(x, Quantity)
+                                                  for x in arg):
+            return True
+    return False
+
+
+def _check_same(func, quantities):
+    """Return the first quantity among the dimensioned arguments (*None* if
+    there isn't one) after checking that they have the same dimension.
+    """
+    prototype = _first_quantity(quantities)
+    dimension = _dimension(prototype)
+    for x in quantities:
+        if x is not None and _dimension(x) is not dimension:
+            raise TypeError("%s requires arguments with the same dimension."
+                            % func.__name__)
+    return prototype
+
+
+def _wrap(result, dimension, display_unit):
+    """Return the result as a quantity or, if it is a list or tuple, each of
+    its items as a quantity.
+    """
+    if isinstance(result, (list, tuple)):
+        return type(result)(Quantity.quicknew(item, dimension, display_unit)
+                            for item in result)
+    return Quantity.quicknew(result, dimension, display_unit)
+
+
+def _wrap_product(result, dimension, display_unit):
+    """Return the result of a product as a quantity unless it is
+    dimensionless.
+    """
+    if dimension:
+        return Quantity.quicknew(result, dimension, display_unit)
+    return result
+
+
+def _same(func, args, kwargs, quantities):
+    """Apply a function whose dimensioned arguments must be homogeneous and
+    whose result has their dimension.
+    """
+    prototype = _check_same(func, quantities)
+    result = func(*args, **kwargs)
+    if prototype is None:
+        return result
+    dimension, display_unit = prototype._dimension, prototype._display_unit
+    if func is np.unique and isinstance(result, tuple):
+        # Only the unique values are quantities (not the indices or counts).
+        return (_wrap(result[0], dimension, display_unit),) + result[1:]
+    return _wrap(result, dimension, display_unit)
+
+
+def _each(func, args, kwargs, quantities):
+    """Apply a function whose result has an item for each argument."""
+    result = func(*args, **kwargs)
+    if not isinstance(result, (list, tuple)):
+        quantities = quantities[:1]
+        result = [result]
+        single = True
+    else:
+        single = False
+    result = [Quantity.quicknew(item, x._dimension, x._display_unit)
+              if isinstance(x, Quantity) else item
+              for item, x in zip(result, quantities)]
+    return result[0] if single else result
+
+
+def _compare(func, args, kwargs, quantities):
+    """Apply a function whose dimensioned arguments must be homogeneous and
+    whose result isn't a quantity.
+    """
+    _check_same(func, quantities)
+    return func(*args, **kwargs)
+
+
+def _value_only(func, args, kwargs, quantities):
+    """Apply a function whose result doesn't depend on dimension."""
+    # pylint: disable=I0011, W0613
+    return func(*args, **kwargs)
+
+
+def _dimensionless(func, args, kwargs, quantities):
+    """Apply a function whose arguments must be dimensionless."""
+    if any(x is not None and _dimension(x) for x in quantities):
+        raise TypeError("%s requires dimensionless arguments."
+                        % func.__name__)
+    return func(*args, **kwargs)
+
+
+def _square(func, args, kwargs, quantities):
+    """Apply a function whose result has the square of the dimension of the
+    argument.
+    """
+    x = quantities[0]
+    result = func(*args, **kwargs)
+    if not isinstance(x, Quantity):
+        return result
+    return _wrap_product(result, x._dimension * 2, x._display_unit * 2)
+
+
+def _product(func, args, kwargs, quantities):
+    """Apply a function whose result has the product of the dimensions of the
+    arguments.
+    """
+    if func is np.einsum and not isinstance(args[0], str):
+        return NotImplemented # The sublist format isn't supported.
+    result = func(*args, **kwargs)
+    dimension = DIMENSIONLESS
+    display_unit = None
+    for x in quantities:
+        if isinstance(x, Quantity):
+            dimension = dimension + x._dimension
+            display_unit = (x._display_unit if display_unit is None
+                            else display_unit + x._display_unit)
+    return _wrap_product(result, dimension, display_unit)
+
+
+def _prod(func, args, kwargs, quantities):
+    """Apply :func:`numpy.prod` or :func:`numpy.nanprod`, whose result has the
+    dimension of the argument raised to the number of factors.
+    """
+    x = quantities[0]
+    result = func(*args, **kwargs)
+    if not isinstance(x, Quantity) or not x._dimension:
+        return result
+    axis = args[1] if len(args) > 1 else kwargs.get('axis')
+    shape = np.shape(x._value)
+    if axis is None:
+        n = int(np.prod(shape))
+    else:
+        axes = axis if isinstance(axis, tuple) else (axis,)
+        n = 1
+        for ax in axes:
+            n *= shape[ax]
+    return _wrap_product(result, x._dimension * n, x._display_unit * n)
+
+
+def _gradient(func, args, kwargs, quantities):
+    """Apply :func:`numpy.gradient`, whose results have the dimension of the
+    function divided by that of the spacing along each axis.
+    """
+    f, spacings = quantities[0], quantities[1:]
+    result = func(*args, **kwargs)
+    if not isinstance(f, Quantity) and not _first_quantity(spacings):
+        return result
+    single = not isinstance(result, (list, tuple))
+    items = [result] if single else list(result)
+    if len(spacings) <= 1:
+        spacings = spacings * len(items) or [None] * len(items)
+    items = [_wrap_product(item, _dimension(f) - _dimension(spacing),
+                           _display_quotient(f, spacing))
+             for item, spacing in zip(items, spacings)]
+    return items[0] if single else type(result)(items)
+
+
+def _trapezoid(func, args, kwargs, quantities):
+    """Apply :func:`numpy.trapezoid`, whose result has the dimension of the
+    integrand times that of the spacing.
+    """
+    y, x, dx = quantities
+    spacing = dx if x is None else x
+    result = func(*args, **kwargs)
+    dimension = _dimension(y) + _dimension(spacing)
+    if not dimension:
+        return result
+    return Quantity.quicknew(result, dimension, _display_product(y, spacing))
+
+
+def _interp(func, args, kwargs, quantities):
+    """Apply :func:`numpy.interp`, whose result has the dimension of *fp*."""
+    x, xp, fp, left, right, period = quantities
+    _check_same(func, [x, xp, period])
+    prototype = _check_same(func, [fp, left, right])
+    result = func(*args, **kwargs)
+    if prototype is None:
+        return result
+    return Quantity.quicknew(result, prototype._dimension,
+                             prototype._display_unit)
+
+
+def _average(func, args, kwargs, quantities):
+    """Apply :func:`numpy.average`, whose result has the dimension of the
+    array.  The weights may have any dimension.
+    """
+    a, weights = quantities
+    result = func(*args, **kwargs)
+    if isinstance(result, tuple):
+        average, weight_sum = result
+        if isinstance(weights, Quantity):
+            weight_sum = Quantity.quicknew(weight_sum, weights._dimension,
+                                           weights._display_unit)
+    else:
+        average, weight_sum = result, None
+    if isinstance(a, Quantity):
+        average = Quantity.quicknew(average, a._dimension, a._display_unit)
+    return average if weight_sum is None else (average, weight_sum)
+
+
+def _display_product(x, y):
+    """Return the display unit of the product of *x* and *y*, either of which
+    may be a non-quantity.
+    """
+    if not isinstance(x, Quantity):
+        return y._display_unit if isinstance(y, Quantity) else None
+    if not isinstance(y, Quantity):
+        return x._display_unit
+    return x._display_unit + y._display_unit
+
+
+def _display_quotient(x, y):
+    """Return the display unit of the quotient of *x* and *y*, either of which
+    may be a non-quantity.
+    """
+    if not isinstance(y, Quantity):
+        return x._display_unit if isinstance(x, Quantity) else None
+    if not isinstance(x, Quantity):
+        return -y._display_unit
+    return x._display_unit - y._display_unit
+
+
+# Functions that apply the rules, by name
+_RULES = dict(same=_same, each=_each, compare=_compare, value=_value_only,
+              dimensionless=_dimensionless, square=_square, product=_product,
+              prod=_prod, gradient=_gradient, trapezoid=_trapezoid,
+              interp=_interp, average=_average)
@@ -85,15 +85,15 @@ def merge_raise(value, prototype, power):
     unit to *power*
     """
     try:
-        dimension = prototype.dimension
+        dimension = prototype._dimension * power
     except AttributeError:
         return value
+    display_unit = prototype._display_unit * power
     try:
-        prefixable = prototype.prefixable
+        prefixable = prototype._prefixable
     except AttributeError:
-        return Quantity(value, power*dimension, power*prototype.display_unit)
-    return ScalarUnit(value, power*dimension, power*prototype.display_unit,
-                      prefixable)
+        return Quantity.quicknew(value, dimension, display_unit)
+    return ScalarUnit.quicknew(value, dimension, display_unit, prefixable)
 
 # Elementary wrappers
 # -------------------
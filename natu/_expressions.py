@@ -0,0 +1,360 @@
+#!/usr/bin/python
+r"""Contains :class:`Expression`, a restricted expression compiled from the
+definition of a constant or unit in a \*.ini file
+
+Unlike :func:`eval`, an expression can't import modules, access attributes, or
+call anything besides the provided functions and classes, so a definition file
+can't run arbitrary code.  The syntax tree is compiled once into nested
+closures, and the compiled expressions are cached by string (see
+*expression_cache_size* in :mod:`natu.config`).
+
+Most definitions are products and quotients of names and numbers (e.g.,
+``m**2/s**2, True``).  These are matched by a regular expression and compiled
+directly, without building the syntax tree, so loading the definitions is at
+least as fast as with :func:`eval`.
+"""
+# pylint: disable=I0011, C0103
+
+import ast
+import re
+
+from operator import add, mul, neg, pos, pow, sub, truediv
+
+from .config import expression_cache_size
+from .util import LRUCache
+
+# Supported operators
+_BINARY_OPERATORS = {ast.Add: add, ast.Sub: sub, ast.Mult: mul,
+                     ast.Div: truediv, ast.Pow: pow}
+_UNARY_OPERATORS = {ast.UAdd: pos, ast.USub: neg}
+
+# Names of the constants that are keywords in Python 3
+_KEYWORD_CONSTANTS = {'True': True, 'False': False, 'None': None}
+
+# Types of the supported literals
+try:
+    _LITERAL_TYPES = (bool, int, long, float, complex, str, unicode)
+except NameError:
+    # Python 3
+    _LITERAL_TYPES = (bool, int, float, complex, str)
+
+# Simple expressions---a product or quotient of names and numbers, each
+# optionally raised to a numeric power, and an optional flag
+_NUMBER = r'(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?'
+_FACTOR = r'(?:[A-Za-z_]\w*|%s)(?:\s*\*\*\s*-?%s)?' % (_NUMBER, _NUMBER)
+_SIMPLE = re.compile(r'\s*(%s(?:\s*[*/]\s*%s)*)\s*(?:,\s*(True|False)\s*)?$'
+                     % (_FACTOR, _FACTOR))
+_TOKEN = re.compile(r'\*\*\s*(-?%s)|([*/])|([A-Za-z_]\w*)|(%s)'
+                    % (_NUMBER, _NUMBER))
+
+# Compiled expressions, by string
+_compiled = LRUCache(expression_cache_size)
+
+
+def compile_expression(expr):
+    """Return the :class:`Expression` compiled from a string (*expr*).
+
+    The result is cached, so each string is only compiled once (unless it has
+    been evicted from the cache).
+
+    **Example:**
+
+    >>> expression = compile_expression('m**2/s**2, True')
+    >>> expression(dict(m=3, s=2).__getitem__)
+    (2.25, True)
+    >>> compile_expression('m**2/s**2, True') is expression
+    True
+    """
+    try:
+        return _compiled[expr]
+    except KeyError:
+        compiled = _compiled[expr] = Expression(expr)
+        return compiled
+
+
+class Expression(object):
+
+    """Restricted expression compiled from a string
+
+    **Initialization parameters:**
+
+    - *expr*: String with the expression
+
+         The expression may contain numbers, strings, names, the arithmetic
+         operators (+, -, \\*, /, and \\*\\*), calls with positional arguments,
+         tuples, conditional expressions (*x* if *condition* else *y*), and
+         lambda functions.  Otherwise, a :class:`SyntaxError` is raised.
+
+    **Properties:**
+
+    - :attr:`names` - Set of the names used by the expression (including
+      those in the bodies of the lambda functions, but not their arguments)
+
+    To evaluate the expression, call it with a function that returns the value
+    of a name.  It should raise a :class:`NameError` if the name isn't
+    defined.  The names in the lambda functions are looked up when the
+    functions are called.
+
+    **Example:**
+
+    >>> expression = Expression('(lambda n: n*2*a, b)')
+    >>> sorted(expression.names)
+    ['a', 'b']
+    >>> f, b = expression(dict(a=3, b=4).__getitem__)
+    >>> f(1), b
+    (6, 4)
+    >>> Expression('().__class__')
+    Traceback (most recent call last):
+    ...
+    SyntaxError: ().__class__ contains unsupported syntax (Attribute)
+    """
+
+    def __init__(self, expr):
+        """Parse and compile the expression.
+
+        See the top-level class documentation.
+        """
+        self._expr = expr
+        self.names = set()
+        match = _SIMPLE.match(expr)
+        if match:
+            self._evaluate = self._compile_simple(*match.groups())
+            return
+        tree = compile(expr.strip(), '<definition>', 'eval', ast.PyCF_ONLY_AST)
+        self._evaluate = self._compile(tree.body, frozenset())
+
+    def __call__(self, lookup):
+        """Evaluate the expression, looking up names using the function
+        *lookup*.
+        """
+        return self._evaluate(lookup, None)
+
+    def __repr__(self):
+        return "Expression(%r)" % self._expr
+
+    def _error(self, description):
+        """Return a :class:`SyntaxError` regarding the expression."""
+        return SyntaxError("%s contains %s" % (self._expr, description))
+
+    def _compile_simple(self, product, flag):
+        """Compile a simple expression (see *_SIMPLE*) from the product (or
+        quotient) and the flag (or *None*) without the syntax tree.
+
+        The operations are applied from left to right, as in Python.
+        """
+        # Each factor is a tuple of the operator that applies it (*None* for
+        # the first factor), the name or value, whether it is a name, and the
+        # exponent (or *None*).
+        factors = []
+        operator = None
+        for exponent, symbol, name, number in _TOKEN.findall(product):
+            if exponent:
+                factors[-1] = factors[-1][:3] + (_number(exponent),)
+            elif symbol:
+                operator = mul if symbol == '*' else truediv
+            elif name in _KEYWORD_CONSTANTS: # (Python 2)
+                factors.append((operator, _KEYWORD_CONSTANTS[name], False,
+                                None))
+            elif name:
+                self.names.add(name)
+                factors.append((operator, name, True, None))
+            else:
+                factors.append((operator, _number(number), False, None))
+        _, first, first_is_name, first_exponent = factors[0]
+        rest = factors[1:]
+        flag = None if flag is None else _KEYWORD_CONSTANTS[flag]
+
+        def evaluate(lookup, values):
+            """Evaluate the simple expression."""
+            # pylint: disable=I0011, W0613
+            result = lookup(first) if first_is_name else first
+            if first_exponent is not None:
+                result = result ** first_exponent
+            for operator, operand, is_name, exponent in rest:
+                if is_name:
+                    operand = lookup(operand)
+                if exponent is not None:
+                    operand = operand ** exponent
+                result = operator(result, operand)
+            return result if flag is None else (result, flag)
+        return evaluate
+
+    def _compile(self, node, args):
+        """Compile a node of the syntax tree into a function of the lookup
+        function and a dictionary of the values of the arguments of the
+        enclosing lambda functions.
+
+        *args* is the set of the names of those arguments.
+        """
+        try:
+            compile_node = _COMPILERS[type(node).__name__]
+        except KeyError:
+            raise self._error("unsupported syntax (%s)" % type(node).__name__)
+        return compile_node(self, node, args)
+
+    def _operand(self, node, args):
+        """Return a tuple of the kind of an operand ('literal', 'name', or
+        *None*) and its value, name, or compiled function.
+
+        Literals and names are returned directly so that operations on them
+        can be specialized.
+        """
+        if isinstance(node, ast.Name):
+            name = node.id
+            if name in args:
+                return None, lambda lookup, values: values[name]
+            if name in _KEYWORD_CONSTANTS: # (Python 2)
+                return 'literal', _KEYWORD_CONSTANTS[name]
+            self.names.add(name)
+            return 'name', name
+        value = _literal(node)
+        if value is not _NOT_LITERAL:
+            if not (value is None or isinstance(value, _LITERAL_TYPES)):
+                raise self._error("an unsupported constant")
+            return 'literal', value
+        return None, self._compile(node, args)
+
+    def _compile_BinOp(self, node, args):
+        """Compile an arithmetic operation with two operands."""
+        # pylint: disable=I0011, R0911
+        try:
+            operator = _BINARY_OPERATORS[type(node.op)]
+        except KeyError:
+            raise self._error("an unsupported operator")
+        left_kind, left = self._operand(node.left, args)
+        right_kind, right = self._operand(node.right, args)
+        if left_kind == 'literal':
+            if right_kind == 'literal':
+                value = operator(left, right)
+                return lambda lookup, values: value
+            if right_kind == 'name':
+                return lambda lookup, values: operator(left, lookup(right))
+            return lambda lookup, values: operator(left, right(lookup, values))
+        if left_kind == 'name':
+            if right_kind == 'literal':
+                return lambda lookup, values: operator(lookup(left), right)
+            if right_kind == 'name':
+                return lambda lookup, values: operator(lookup(left),
+                                                       lookup(right))
+            return lambda lookup, values: operator(lookup(left),
+                                                   right(lookup, values))
+        if right_kind == 'literal':
+            return lambda lookup, values: operator(left(lookup, values), right)
+        if right_kind == 'name':
+            return lambda lookup, values: operator(left(lookup, values),
+                                                   lookup(right))
+        return lambda lookup, values: operator(left(lookup, values),
+                                               right(lookup, values))
+
+    def _compile_UnaryOp(self, node, args):
+        """Compile an arithmetic operation with one operand."""
+        try:
+            operator = _UNARY_OPERATORS[type(node.op)]
+        except KeyError:
+            raise self._error("an unsupported operator")
+        operand = self._compile(node.operand, args)
+        return lambda lookup, values: operator(operand(lookup, values))
+
+    def _compile_operand(self, node, args):
+        """Compile a name or a literal number, string, or keyword constant."""
+        kind, operand = self._operand(node, args)
+        if kind == 'literal':
+            return lambda lookup, values: operand
+        if kind == 'name':
+            return lambda lookup, values: lookup(operand)
+        return operand # Argument of a lambda function
+
+    def _compile_Tuple(self, node, args):
+        """Compile a tuple."""
+        items = [self._compile(item, args) for item in node.elts]
+        return lambda lookup, values: tuple([item(lookup, values)
+                                             for item in items])
+
+    def _compile_Call(self, node, args):
+        """Compile a call with positional arguments."""
+        if not isinstance(node.func, ast.Name):
+            raise self._error("a call to a non-name")
+        if node.keywords or getattr(node, 'starargs', None):
+            raise self._error("a call with unsupported arguments")
+        func = self._compile(node.func, args)
+        arguments = [self._compile(arg, args) for arg in node.args]
+        return lambda lookup, values: func(lookup, values)(
+            *[arg(lookup, values) for arg in arguments])
+
+    def _compile_IfExp(self, node, args):
+        """Compile a conditional expression."""
+        test = self._compile(node.test, args)
+        body = self._compile(node.body, args)
+        orelse = self._compile(node.orelse, args)
+        return lambda lookup, values: (body(lookup, values)
+                                       if test(lookup, values)
+                                       else orelse(lookup, values))
+
+    def _compile_Lambda(self, node, args):
+        """Compile a lambda function."""
+        arguments = node.args
+        if (arguments.vararg or arguments.kwarg or arguments.defaults
+                or getattr(arguments, 'kwonlyargs', None)
+                or getattr(arguments, 'posonlyargs', None)):
+            raise self._error("a lambda function with unsupported arguments")
+        names = [getattr(arg, 'arg', None) or arg.id for arg in arguments.args]
+        body = self._compile(node.body, args.union(names))
+
+        if len(names) == 1 and not args:
+            # Typical case---one argument and no enclosing lambda functions
+            name = names[0]
+            return lambda lookup, values: (
+                lambda value: body(lookup, {name: value}))
+
+        def function(lookup, values):
+            """Create the lambda function."""
+            def evaluate(*arg_values):
+                """Evaluate the lambda function."""
+                if len(arg_values) != len(names):
+                    raise TypeError("expected %i arguments, got %i"
+                                    % (len(names), len(arg_values)))
+                inner = dict(values or {})
+                inner.update(zip(names, arg_values))
+                return body(lookup, inner)
+            return evaluate
+        return function
+
+
+def _number(string):
+    """Return the value of a numeric literal (*string*)."""
+    try:
+        return int(string)
+    except ValueError:
+        return float(string)
+
+
+# Sentinel for a node that isn't a literal
+_NOT_LITERAL = object()
+
+
+def _literal(node):
+    """Return the value of a literal node or *_NOT_LITERAL* if the node isn't a
+    literal.
+    """
+    name = type(node).__name__
+    if name in ('Constant', 'NameConstant'):
+        return node.value
+    if name == 'Num': # Python < 3.8
+        return node.n
+    if name == 'Str': # Python < 3.8
+        return node.s
+    return _NOT_LITERAL
+
+
+# Functions that compile the nodes of the syntax tree, by class name
+_COMPILERS = dict(BinOp=Expression._compile_BinOp,
+                  UnaryOp=Expression._compile_UnaryOp,
+                  Name=Expression._compile_operand,
+                  Constant=Expression._compile_operand,
+                  NameConstant=Expression._compile_operand,
+                  Num=Expression._compile_operand,
+                  Str=Expression._compile_operand,
+                  Tuple=Expression._compile_Tuple,
+                  Call=Expression._compile_Call,
+                  IfExp=Expression._compile_IfExp,
+                  Lambda=Expression._compile_Lambda)
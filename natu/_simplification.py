@@ -0,0 +1,396 @@
+#!/usr/bin/python
+"""Contains :class:`RelationIndex`, which finds a simpler representation of a
+compound unit given the coherent relations among the units
+
+The relations are reduced once (by integer Gaussian elimination) to an
+expansion of each related unit in terms of a set of independent units.  Two
+representations of a unit are equivalent if and only if they have the same
+expansion.  The complexity of a representation is the sum of the absolute
+values of its exponents---the number of unit factors.
+
+A unit is only rewritten with the units whose expansions lie within the
+independent units of its own expansion (e.g., m3 isn't rewritten as J/Pa).
+Those units are indexed upon the first simplification that needs them: each
+expansion that can be formed with up to *RADIUS* factors is mapped to its
+simplest representation.  Joining the index with itself gives the simplest
+representation of up to 2*RADIUS factors, and its cost doesn't depend on the
+unit.  The indexes are bounded (see *MAX_PAIRS* and *MAX_NEIGHBORHOODS*).
+"""
+# pylint: disable=I0011, C0103
+
+from fractions import Fraction
+
+from .util import LRUCache
+
+# Number of unit factors in the largest representations held by an index
+RADIUS = 2
+
+# Largest number of pairs of unit factors that are indexed for a set of units;
+# if there are more, only single factors are indexed for it
+MAX_PAIRS = 4096
+
+# Number of indexes (each for the units within a set of independent units) that
+# are remembered
+MAX_NEIGHBORHOODS = 32
+
+# Bits allocated to each independent unit in the packed expansions
+_FIELD_BITS = 24
+
+# Largest denominator of a fractional exponent that is simplified
+MAX_DENOMINATOR = 12
+
+
+def _add(factors, other, multiple=1):
+    """Add *multiple* times the dictionary *other* to the dictionary *factors*
+    in place, dropping factors that cancel.
+    """
+    for base, exp in other.items():
+        exp = factors.get(base, 0) + multiple*exp
+        if exp:
+            factors[base] = exp
+        else:
+            factors.pop(base, None)
+
+
+def _complexity(factors):
+    """Return the sum of the absolute values of the exponents."""
+    return sum(map(abs, factors.values()))
+
+
+class RelationIndex(object):
+
+    """Index of the simpler representations of compound units
+
+    **Initialization parameters:**
+
+    - *relations*: Iterable of the coherent relations among the units
+
+         Each relation is a :class:`dict` of unit symbols and exponents whose
+         product is unity.  A relation that can't be reduced to one with a
+         unit exponent of 1 or -1 (e.g., one that is redundant) doesn't
+         contribute.
+
+    - *key*: Function that maps a unit (symbol) to a value that orders the
+      units by precedence among equally simple representations
+
+         By default, the units take precedence in the order that they first
+         appear in *relations*.
+
+    **Example:**
+
+    >>> index = RelationIndex([{'kg': 1, 'm': 1, 's': -2, 'N': -1},
+    ...                        {'N': 1, 'm': 1, 'J': -1}])
+    >>> index.simplest({'kg': 1, 'm': 2, 's': -2})
+    {'J': 1}
+    >>> index.simplest({'J': 1, 's': 2, 'kg': -1})
+    {'m': 2}
+    >>> index.simplest({'N': 1, 's': 1}) # Already the simplest
+    """
+
+    def __init__(self, relations, key=None):
+        """Reduce the relations.
+
+        See the top-level class documentation.
+        """
+        # Expand each dependent (pivot) unit in terms of independent units.
+        expansions = {}
+        units = []
+        for relation in relations:
+            reduced = {}
+            for unit, exp in relation.items():
+                if unit not in units:
+                    units.append(unit)
+                _add(reduced, expansions.get(unit, {unit: 1}), exp)
+            pivots = [unit for unit, exp in reduced.items() if abs(exp) == 1]
+            if not pivots:
+                continue
+            pivot = pivots[-1] # The unit defined by the relation, if possible
+            sign = reduced.pop(pivot)
+            expansion = {unit: -sign*exp for unit, exp in reduced.items()}
+            for other in expansions.values():
+                multiple = other.pop(pivot, 0)
+                if multiple:
+                    _add(other, expansion, multiple)
+            expansions[pivot] = expansion
+
+        # Pack each expansion into an integer so that adding and comparing
+        # expansions are single operations.  Fractional exponents are scaled
+        # to integers.
+        if key is not None:
+            units.sort(key=key)
+        bases = [unit for unit in units if unit not in expansions]
+        offsets = {base: _FIELD_BITS*i for i, base in enumerate(bases)}
+        scale = 1
+        for expansion in expansions.values():
+            for exp in expansion.values():
+                denominator = Fraction(exp).denominator
+                scale *= denominator // _gcd(scale, denominator)
+        self._units = units
+        self._codes = codes = {}
+        self._vectors = vectors = {}
+        for unit in units:
+            vector = {offsets[base]: int(exp*scale) for base, exp
+                      in expansions.get(unit, {unit: 1}).items()}
+            codes[unit] = sum(exp << offset for offset, exp in vector.items())
+            vectors[unit] = vector
+
+        # Initialize the indexes of the representations by the sets of
+        # independent units that they span (built upon first use).
+        self._neighborhoods = LRUCache(MAX_NEIGHBORHOODS)
+
+    def __getstate__(self):
+        """Return the state for pickling, without the neighborhoods (which are
+        rebuilt upon use).
+        """
+        state = self.__dict__.copy()
+        del state['_neighborhoods']
+        return state
+
+    def __setstate__(self, state):
+        """Restore the state from pickling."""
+        self.__dict__.update(state)
+        self._neighborhoods = LRUCache(MAX_NEIGHBORHOODS)
+
+    def __contains__(self, unit):
+        """Return *True* if the unit (a symbol) is in a coherent relation."""
+        return unit in self._codes
+
+    def expansion(self, unit):
+        """Return the expansion of a unit in a form that can be compared to
+        others or *None* if the unit can't be expanded.
+
+        **Parameters:**
+
+        - *unit*: :class:`dict` of symbols and exponents
+
+             The unit can only be expanded if each symbol is in the index (see
+             :meth:`__contains__`) and each exponent is an integer.
+        """
+        codes = self._codes
+        code = 0
+        for symbol, exp in unit.items():
+            if symbol not in codes or exp != int(exp):
+                return None
+            code += int(exp)*codes[symbol]
+        return code
+
+    def simplest(self, unit):
+        """Return a simpler representation of a unit.
+
+        **Parameters:**
+
+        - *unit*: :class:`dict` of symbols and exponents
+
+             Each symbol must be in the index (see :meth:`__contains__`).
+             Factors with exponents that aren't integers or fractions with
+             denominators up to *MAX_DENOMINATOR* are left as is.  The others
+             are scaled to integers for the search, so the exponents of the
+             result may be fractions.
+
+        **Returns:** The simpler representation as a :class:`dict` or *None*
+        if there isn't one
+
+        The candidates are formed only from the units whose expansions lie
+        within the independent units of the expansion of *unit* (its
+        neighborhood).  A candidate is only accepted if it is less complex than
+        *unit* and has fewer distinct units.  Among the accepted candidates,
+        the least complex is returned, and then one with fewer distinct units
+        and then one closer to *unit* is preferred.
+
+        Every candidate of up to 2*RADIUS factors is considered, except that
+        the index holds only the simplest representation of each expansion of
+        up to RADIUS factors, so a candidate that would have fewer distinct
+        units through another choice of equally complex halves may be missed.
+        If the neighborhood has more than *MAX_PAIRS* pairs of factors, only
+        single factors are indexed, and candidates of up to two factors are
+        considered.  If there is no candidate within that complexity, one is
+        built by greedily taking the unit factors that most reduce the
+        remaining expansion until the remainder is in the index, and it is
+        accepted under the same conditions.
+        """
+        # Scale the exponents to integers.
+        fixed = {}
+        scaled = {}
+        scale = 1
+        for symbol, exp in unit.items():
+            exp_fraction = Fraction(exp).limit_denominator(MAX_DENOMINATOR)
+            if exp_fraction == exp:
+                scaled[symbol] = exp_fraction
+                denominator = exp_fraction.denominator
+                scale *= denominator // _gcd(scale, denominator)
+            else:
+                fixed[symbol] = exp
+        scaled = {symbol: int(exp*scale) for symbol, exp in scaled.items()}
+
+        target = sum(exp*self._codes[symbol] for symbol, exp in scaled.items())
+        complexity = _complexity(scaled)
+        support = set()
+        for symbol in scaled:
+            support.update(self._vectors[symbol])
+        neighborhood = self._neighborhood(frozenset(support))
+        result = neighborhood.search(target, scaled, complexity)
+        if result is None and complexity > 2*neighborhood.radius + 1:
+            result = neighborhood.pursue(target, scaled, self._vectors)
+            if (_complexity(result) >= complexity
+                    or len(result) >= len(scaled)):
+                result = None
+        if result is None:
+            return None
+        if scale > 1:
+            result = {symbol: _normalize(Fraction(exp, scale))
+                      for symbol, exp in result.items()}
+        result.update(fixed)
+        return result
+
+    def _neighborhood(self, support):
+        """Return the index of the units whose expansions lie within a set of
+        independent units (*support*, a :class:`frozenset` of offsets),
+        building it if necessary.
+        """
+        try:
+            return self._neighborhoods[support]
+        except KeyError:
+            pass
+        vectors = self._vectors
+        neighborhood = _Neighborhood([(unit, self._codes[unit], vectors[unit])
+                                      for unit in self._units
+                                      if support.issuperset(vectors[unit])])
+        self._neighborhoods[support] = neighborhood
+        return neighborhood
+
+
+class _Neighborhood(object):
+
+    """Index of the representations formed from a set of units
+
+    **Initialization parameters:**
+
+    - *units*: List of tuples of the symbol, packed expansion, and expansion
+      vector of each unit, in order of precedence
+
+    **Attributes:**
+
+    - *radius*: Number of unit factors in the largest indexed representations
+
+    The index is filled once and then only read.
+    """
+
+    def __init__(self, units):
+        # Index the representations with 1 to radius factors.  Lower
+        # complexity, then fewer distinct units, then earlier units take
+        # precedence.
+        self._index = index = {0: (0, ())}
+        self._levels = levels = [[]]
+        self._steps = []
+        level = []
+        for unit, code, vector in units:
+            for sign in (1, -1):
+                if sign*code not in index:
+                    entry = (sign*code, 1, ((unit, sign),))
+                    index[sign*code] = entry[1:]
+                    level.append(entry)
+                    self._steps.append((unit, sign, sign*code,
+                                        [(offset, sign*exp) for offset, exp
+                                         in vector.items()]))
+        levels.append(level)
+        self.radius = RADIUS if len(level)**2 <= MAX_PAIRS else 1
+        for complexity in range(2, self.radius + 1):
+            level = {}
+            for code, _, factors in levels[-1]:
+                for code1, _, factors1 in levels[1]:
+                    code2 = code + code1
+                    if code2 in index and code2 not in level:
+                        continue
+                    merged = dict(factors)
+                    _add(merged, dict(factors1))
+                    if code2 in level and len(merged) >= len(level[code2][1]):
+                        continue
+                    level[code2] = (complexity, tuple(merged.items()))
+            index.update(level)
+            levels.append([(code, complexity, factors) for code, (_, factors)
+                           in level.items()])
+
+    def search(self, target, unit, bound):
+        """Return the simplest acceptable representation of the packed
+        expansion *target* with complexity less than *bound* or *None* if there
+        isn't one within 2*radius factors.
+
+        A representation is acceptable if it has fewer distinct units than
+        *unit*.  See :meth:`RelationIndex.simplest`.
+        """
+        index = self._index
+        try:
+            complexity, factors = index[target]
+        except KeyError:
+            pass
+        else:
+            # The index holds the simplest representation up to the radius.
+            if complexity >= bound:
+                return None
+            if len(factors) < len(unit):
+                return dict(factors)
+
+        best = None
+        best_key = (bound,)
+        for complexity1 in range(1, self.radius + 1):
+            for code, _, factors in self._levels[complexity1]:
+                try:
+                    _, factors1 = index[target - code]
+                except KeyError:
+                    continue
+                candidate = dict(factors)
+                _add(candidate, dict(factors1))
+                complexity = _complexity(candidate)
+                if complexity > best_key[0] or len(candidate) >= len(unit):
+                    continue
+                difference = dict(candidate)
+                _add(difference, unit, -1)
+                key = (complexity, len(candidate), _complexity(difference))
+                if key < best_key:
+                    best, best_key = candidate, key
+            if best_key[0] <= complexity1 + self.radius + 1:
+                # Anything simpler would have been found by now.
+                break
+        return best
+
+    def pursue(self, target, unit, vectors):
+        """Return a representation of the packed expansion *target*, taking the
+        greedy steps described in :meth:`RelationIndex.simplest`.
+
+        The expansion of *unit* must be *target*, and *vectors* is the
+        dictionary of the expansion vectors of the units.
+        """
+        index = self._index
+        remainder = {}
+        for symbol, exp in unit.items():
+            _add(remainder, vectors[symbol], exp)
+        factors = {}
+        while target not in index:
+            # Each independent unit of the neighborhood is itself a step, so
+            # some step reduces the remainder.
+            best_change = 0
+            for step in self._steps:
+                change = 0
+                for offset, exp in step[3]:
+                    exp0 = remainder.get(offset, 0)
+                    change += abs(exp0 - exp) - abs(exp0)
+                if change < best_change:
+                    best_change, best = change, step
+            symbol, sign, code, vector = best
+            _add(factors, {symbol: sign})
+            _add(remainder, dict(vector), -1)
+            target -= code
+        _add(factors, dict(index[target][1]))
+        return factors
+
+
+def _normalize(exp):
+    """Return a fractional exponent as an :class:`int` if it is whole."""
+    return exp.numerator if exp.denominator == 1 else exp
+
+
+def _gcd(a, b):
+    """Return the greatest common divisor of two positive integers."""
+    while b:
+        a, b = b, a % b
+    return a
@@ -0,0 +1,135 @@
+#!/usr/bin/python
+r"""Functions to save and load snapshots of the units loaded from \*.ini files
+
+A snapshot is a pickle of the state of a :class:`~natu.core.Units` dictionary
+once all of the definitions loaded by :meth:`~natu.core.Units.load_ini` have
+been evaluated, including the index of the coherent relations.  It is named by
+a hash of the contents of the \*.ini files, the settings that affect the
+loaded units, and the source of the modules of :mod:`natu`, so a snapshot is
+never used once any of these change.  Instead, the units are loaded from the
+\*.ini files again and a new snapshot is saved.
+
+Since unpickling a file can execute arbitrary code, a snapshot is only loaded
+if it is owned by the current user and isn't writable by the group or others.
+"""
+# pylint: disable=I0011, C0103
+
+import sys
+
+from glob import glob
+from os import getpid, makedirs, path, remove, rename, stat
+
+try:
+    from os import getuid
+except ImportError:
+    # For Windows:
+    getuid = None
+
+try:
+    # The built-in module loads faster than hashlib, which loads OpenSSL.
+    from _sha1 import sha1
+except ImportError:
+    from hashlib import sha1
+
+try:
+    import cPickle as pickle
+except ImportError:
+    # For Python 3:
+    import pickle
+
+# Modules of the package (any of which may affect the loaded units)
+_SOURCES = sorted(glob(path.join(path.dirname(path.abspath(__file__)),
+                                 '*.py')))
+
+# Pickle protocol (the highest one that Python 2 can read)
+_PROTOCOL = 2
+
+
+def key(files, *settings):
+    r"""Return the name of the snapshot of a list of \*.ini files (*files*)
+    loaded with the given settings or *None* if a file can't be read.
+
+    **Example:**
+
+    >>> from natu.config import definitions
+    >>> key(definitions, True) == key(definitions, True)
+    True
+    >>> key(definitions, True) == key(definitions, False)
+    False
+    >>> print(key(['missing.ini']))
+    None
+    """
+    digest = sha1(repr((sys.version_info[0], settings)).encode())
+    for fname in _SOURCES + list(files):
+        try:
+            with open(fname, 'rb') as f:
+                digest.update(f.read())
+        except (IOError, OSError):
+            return None
+    return 'units-' + digest.hexdigest() + '.pickle'
+
+
+def load(dname, name, units):
+    """Return the state saved as snapshot *name* in directory *dname* or *None*
+    if it isn't available or can't be trusted.
+
+    The references to the :class:`~natu.core.Units` dictionary that the
+    snapshot was saved from are restored as references to *units*.
+    """
+    fname = path.join(dname, name)
+    if not _trusted(fname):
+        return None
+    try:
+        with open(fname, 'rb') as f:
+            unpickler = pickle.Unpickler(f)
+            unpickler.persistent_load = lambda pid: units
+            return unpickler.load()
+    except Exception: # pylint: disable=I0011, W0703
+        # The snapshot is missing, unreadable, or incompatible.
+        return None
+
+
+def save(dname, name, state, units):
+    r"""Save *state* as snapshot *name* in directory *dname*.
+
+    References to the :class:`~natu.core.Units` dictionary *units* (e.g., in
+    the display units) are saved as persistent IDs rather than by value.
+
+    The snapshot is written to a temporary file first so that another process
+    never reads an incomplete snapshot.  Failures (e.g., due to permissions)
+    are ignored; the units are simply loaded from the \*.ini files next time.
+    """
+    fname = path.join(dname, name)
+    tmpname = '%s.%i.tmp' % (fname, getpid())
+    try:
+        if not path.isdir(dname):
+            makedirs(dname, 0o700)
+        with open(tmpname, 'wb') as f:
+            pickler = pickle.Pickler(f, _PROTOCOL)
+            pickler.persistent_id = lambda obj: ('units' if obj is units
+                                                 else None)
+            pickler.dump(state)
+        if path.exists(fname):
+            remove(fname) # Required by rename() on Windows
+        rename(tmpname, fname)
+    except (IOError, OSError, pickle.PicklingError):
+        try:
+            remove(tmpname)
+        except (IOError, OSError):
+            pass
+
+
+def _trusted(fname):
+    """Return *True* if the file *fname* is owned by the current user and isn't
+    writable by the group or others.
+
+    On platforms without user IDs (e.g., Windows), only the existence of the
+    file is checked.
+    """
+    try:
+        status = stat(fname)
+    except (IOError, OSError):
+        return False
+    if getuid is None:
+        return True
+    return status.st_uid == getuid() and not status.st_mode & 0o022
@@ -0,0 +1,292 @@
+#!/usr/bin/python
+"""Rules to apply NumPy_ universal functions (ufuncs) to quantities
+
+:meth:`natu.core.Quantity.__array_ufunc__` calls :func:`apply`, which looks up
+the rule for the ufunc by name.  The rule checks the dimensions of the
+arguments and determines the dimension and display unit of the result once per
+call.  The ufunc itself is applied to the values (typically arrays) of the
+quantities, so the math runs at the speed of NumPy_.  Numbers and arrays are
+considered dimensionless.  A ufunc without a rule isn't supported for
+quantities.
+
+These are the rules:
+
+- *same*: The arguments must have the same dimension.  The result has the
+  dimension and display unit of the first argument.
+
+- *compare*: The arguments must have the same dimension, and the result is not
+  a quantity.  :func:`numpy.equal` and :func:`numpy.not_equal` accept different
+  dimensions and consider the arguments unequal (like
+  :meth:`~natu.core.Quantity.__eq__`).
+
+- *unary*: The result has the dimension and display unit of the argument.
+
+- *dimensionless*: The arguments must be dimensionless, and the result is not a
+  quantity.
+
+- *dimensionless_unary*: The argument must be dimensionless.  The result has
+  the display unit of the argument.
+
+- *value*: The arguments may have any dimension, and the result is not a
+  quantity.
+
+- *copysign*: The result has the dimension and display unit of the first
+  argument.  The second argument may have any dimension.
+
+- *product*: The dimensions and display units are added (for
+  :func:`numpy.multiply`), subtracted (:func:`numpy.divide`), or negated
+  (:func:`numpy.reciprocal`).
+
+- *power*: The dimension and display unit are multiplied by the exponent, which
+  must be a dimensionless scalar (or fixed, as for :func:`numpy.sqrt`).
+
+- *trig*: The argument must be an angle (or dimensionless if angle is
+  dimensionless), and the result is not a quantity.
+
+- *inv_trig*: The arguments must be dimensionless (:func:`numpy.arcsin`, etc.)
+  or have the same dimension (:func:`numpy.arctan2`).  The result is an angle.
+
+If a result is dimensionless and the rule doesn't call for a quantity, it is
+returned as a number or array (as for :meth:`~natu.core.Quantity.__mul__`).
+Only the *same* and *unary* rules support the :meth:`reduce`,
+:meth:`accumulate`, and :meth:`reduceat` methods of the ufuncs (e.g.,
+``np.multiply.reduce`` isn't supported; use :func:`numpy.prod`).
+
+The rounding ufuncs (:func:`numpy.floor`, :func:`numpy.ceil`,
+:func:`numpy.rint`, and :func:`numpy.trunc`) follow the *dimensionless_unary*
+rule because the value of a quantity with a dimension depends on the base
+units; rounding it would round a number of base units rather than the number
+that is displayed.  Divide by a unit first (e.g., ``np.floor(x/m)*m``).
+
+.. _NumPy: http://numpy.scipy.org/
+"""
+# pylint: disable=I0011, C0103, W0212
+
+from fractions import Fraction
+
+import numpy as np
+
+from .core import DIMENSIONLESS, LambdaUnit, Quantity, _registry
+
+# Ufuncs by rule
+_RULES = {}
+for _rule, _names in [
+        ('same', 'add subtract maximum minimum fmax fmin fmod remainder hypot '
+                 'nextafter'),
+        ('compare', 'equal not_equal greater greater_equal less less_equal '
+                    'floor_divide'),
+        ('unary', 'negative positive absolute fabs conjugate spacing'),
+        ('dimensionless', 'exp expm1 exp2 log log2 log10 log1p logaddexp '
+                          'logaddexp2 sinh cosh tanh arcsinh arccosh arctanh'),
+        ('dimensionless_unary', 'rint floor ceil trunc'),
+        ('value', 'isfinite isinf isnan signbit sign'),
+        ('copysign', 'copysign'),
+        ('product', 'multiply divide true_divide matmul reciprocal'),
+        ('power', 'power float_power square sqrt cbrt'),
+        ('trig', 'sin cos tan'),
+        ('inv_trig', 'arcsin arccos arctan arctan2')]:
+    for _name in _names.split():
+        _RULES[_name] = _rule
+del _rule, _names, _name
+
+# Fixed exponents of the power ufuncs
+_EXPONENTS = dict(square=2, sqrt=Fraction(1, 2), cbrt=Fraction(1, 3))
+
+
+def apply(ufunc, method, inputs, kwargs):
+    """Apply a ufunc to arguments (*inputs*) that include quantities.
+
+    **Parameters:**
+
+    - *ufunc*: The ufunc (e.g., :func:`numpy.add`)
+
+    - *method*: Name of the method of the ufunc that was called (e.g.,
+      '__call__' or 'reduce')
+
+    - *inputs*: Tuple of the positional arguments
+
+    - *kwargs*: Dictionary of the keyword arguments
+
+         If *out* includes quantities, their values receive the result, and
+         the quantities are updated with its dimension and display unit.
+
+    **Returns:** The result or :const:`NotImplemented` if the ufunc or method
+    isn't supported
+
+    **Example:**
+
+    >>> import numpy as np
+    >>> from natu.units import m, s, rad
+    >>> x = np.array([1, 2, 3])*m
+    >>> print(np.add(x, 1*m))
+    [2. 3. 4.] m
+    >>> print(np.multiply(x, x))
+    [1. 4. 9.] m2
+    >>> print(np.sqrt(x*x))
+    [1. 2. 3.] m
+    >>> np.isfinite(x)
+    array([ True,  True,  True])
+    >>> print(np.cos(np.pi*rad))
+    -1.0
+    >>> np.add(x, 1*s)
+    Traceback (most recent call last):
+    ...
+    TypeError: add requires arguments with the same dimension.
+    """
+    # pylint: disable=I0011, R0911, R0912
+    try:
+        rule = _RULES[ufunc.__name__]
+    except KeyError:
+        return NotImplemented
+    if method != '__call__' and rule not in ('same', 'unary'):
+        return NotImplemented
+    if any(isinstance(x, LambdaUnit) for x in inputs):
+        return NotImplemented
+
+    # Replace the quantities in the output with their values.
+    out = kwargs.get('out')
+    if out is not None:
+        kwargs['out'] = tuple(_value(x) for x in out)
+
+    values = [_value(x) for x in inputs]
+    dimensions = [_dimension(x) for x in inputs]
+    name = ufunc.__name__
+    prototype = _first_quantity(inputs)
+
+    if rule in ('same', 'compare'):
+        if any(dimension is not dimensions[0] for dimension in dimensions):
+            if name == 'equal':
+                return _finish(np.zeros(np.broadcast(*values).shape, bool),
+                               out)
+            if name == 'not_equal':
+                return _finish(np.ones(np.broadcast(*values).shape, bool),
+                               out)
+            raise TypeError("%s requires arguments with the same dimension."
+                            % name)
+        result = getattr(ufunc, method)(*values, **kwargs)
+        if rule == 'compare' or not isinstance(inputs[0], Quantity):
+            return _finish(result, out)
+        return _finish(result, out, dimensions[0], inputs[0]._display_unit)
+
+    if rule == 'unary':
+        return _finish(getattr(ufunc, method)(*values, **kwargs), out,
+                       dimensions[0], inputs[0]._display_unit)
+
+    if rule in ('dimensionless', 'dimensionless_unary'):
+        if any(dimensions):
+            raise TypeError("%s requires dimensionless arguments." % name)
+        result = ufunc(*values, **kwargs)
+        if rule == 'dimensionless':
+            return _finish(result, out)
+        return _finish(result, out, DIMENSIONLESS, inputs[0]._display_unit)
+
+    if rule == 'value':
+        return _finish(ufunc(*values, **kwargs), out)
+
+    if rule == 'copysign':
+        result = ufunc(*values, **kwargs)
+        if not isinstance(inputs[0], Quantity):
+            return _finish(result, out)
+        return _finish(result, out, dimensions[0], inputs[0]._display_unit)
+
+    if rule == 'product':
+        result = ufunc(*values, **kwargs)
+        display_units = [x._display_unit if isinstance(x, Quantity) else None
+                         for x in inputs]
+        if name == 'reciprocal':
+            dimension = -dimensions[0]
+            display_unit = -display_units[0]
+        elif name in ('multiply', 'matmul'):
+            dimension = dimensions[0] + dimensions[1]
+            display_unit = _combine(display_units[0], display_units[1], 1)
+        else:
+            dimension = dimensions[0] - dimensions[1]
+            display_unit = _combine(display_units[0], display_units[1], -1)
+        return _finish(result, out, dimension, display_unit)
+
+    if rule == 'power':
+        if name in _EXPONENTS:
+            exponent = _EXPONENTS[name]
+        else:
+            if dimensions[1]:
+                raise TypeError("The exponent must be dimensionless.")
+            exponent = values[1]
+            if np.ndim(exponent):
+                if dimensions[0] and np.size(exponent) != 1:
+                    raise TypeError("The exponent of a quantity must be a "
+                                    "scalar.")
+                exponent = np.ravel(exponent)[0]
+        if not isinstance(inputs[0], Quantity):
+            return _finish(ufunc(*values, **kwargs), out)
+        result = ufunc(*values, **kwargs)
+        return _finish(result, out, dimensions[0] * exponent,
+                       inputs[0]._display_unit * exponent)
+
+    # Angles
+    rad = _registry(prototype._display_unit)['rad']
+    if rule == 'trig':
+        if dimensions[0] is not rad._dimension:
+            raise TypeError("The argument must be an angle or zero.")
+        return _finish(ufunc(values[0] / rad._value, **kwargs), out)
+    if any(dimension is not dimensions[0] for dimension in dimensions[1:]):
+        raise TypeError("%s requires arguments with the same dimension."
+                        % name)
+    if name != 'arctan2' and dimensions[0]:
+        raise TypeError("%s requires dimensionless arguments." % name)
+    result = ufunc(*values, **kwargs)
+    result *= rad._value
+    return _finish(result, out, rad._dimension, rad._display_unit,
+                   force=True)
+
+
+def _value(x):
+    """Return the value of a quantity or anything else as is."""
+    return x._value if isinstance(x, Quantity) else x
+
+
+def _dimension(x):
+    """Return the dimension of a quantity or DIMENSIONLESS otherwise."""
+    return x._dimension if isinstance(x, Quantity) else DIMENSIONLESS
+
+
+def _first_quantity(inputs):
+    """Return the first argument that is a quantity."""
+    for x in inputs:
+        if isinstance(x, Quantity):
+            return x
+
+
+def _combine(display_unit1, display_unit2, sign):
+    """Return the sum (*sign* = 1) or difference (*sign* = -1) of two display
+    units, either of which may be *None* (not a quantity).
+    """
+    if display_unit1 is None:
+        return display_unit2 if sign == 1 else -display_unit2
+    if display_unit2 is None:
+        return display_unit1
+    if sign == 1:
+        return display_unit1 + display_unit2
+    return display_unit1 - display_unit2
+
+
+def _finish(result, out, dimension=None, display_unit=None, force=False):
+    """Return the result of a ufunc as a quantity with *dimension* and
+    *display_unit* or as is if *dimension* is *None* or dimensionless (unless
+    *force* is *True*).
+
+    If *out* includes quantities, they are updated and returned instead.
+    """
+    quantity = dimension is not None and (force or dimension)
+    if out is not None and any(isinstance(x, Quantity) for x in out):
+        for x in out:
+            if isinstance(x, Quantity):
+                if quantity:
+                    x._dimension = dimension
+                    x._display_unit = display_unit
+                else:
+                    x._dimension = DIMENSIONLESS
+                    x._display_unit = display_unit or x._display_unit * 0
+        return out[0] if len(out) == 1 else out
+    if quantity:
+        return Quantity.quicknew(result, dimension, display_unit)
+    return result
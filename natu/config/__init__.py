@@ -21,12 +21,77 @@ This module contains the following settings (defaults in parentheses):
      of a number and a unit, so it is probably best to leave *use_quantities*
      set to *True* until you have validated your unit-dependent code.
 
-- *simplification_level* (2) - Number of non-minimizing substitutions that can
-  be made in seeking the best display unit
-
-     A higher number increases the likelihood that the simplest display unit
-     will be found, but it also increases the time required to process
-     :func:`str`, :func:`print`, :func:`format`, and related functions.
+- *simplification_level* (1) - 0 to turn off the simplification of display
+  units
+
+     Otherwise, a simpler display unit is sought by an indexed search
+     (see :meth:`~natu.core.Units.simplify`) whose cost doesn't depend on this
+     value.
+
+- *lazy_simplification* (*True*) - *True* to simplify a display unit only when
+  it is accessed
+
+     Most intermediate quantities are never displayed, so this avoids the cost
+     of simplifying their display units.  If *lazy_simplification* is *False*,
+     then display units are simplified whenever they are set (e.g., as each
+     quantity is created).
+
+- *simplification_cache_size* (1024) - Maximum number of simplified display
+  units that are remembered
+
+     The same compound units tend to recur, so the result of each
+     simplification is cached.  The least recently used result is discarded
+     when the cache is full.
+
+- *format_cache_size* (1024) - Maximum number of compiled unit formats that
+  are remembered
+
+     To format a quantity, its display unit is evaluated and formatted as a
+     string.  These results are cached by display unit and format code, so
+     formatting many quantities of the same unit only divides and formats
+     the numbers.
+
+- *parse_cache_size* (1024) - Maximum number of parsed string expressions of
+  units and dimensions that are remembered
+
+     Display units and dimensions are often given as strings (e.g.,
+     ``Quantity(1, 'L/T', 'm/s')``).  The parsed factors are cached by string
+     so that the same string isn't parsed again.  The same limit applies to
+     the dimensions that are looked up by string.
+
+- *expression_cache_size* (1024) - Maximum number of compiled definitions
+  (expressions from the \*.ini files) that are remembered
+
+     Each definition is compiled into a restricted expression (see
+     :mod:`natu._expressions`).  The compiled expressions are cached by string
+     so that loading the same files again doesn't compile them again.
+
+- *preferred_units* ('Hz', 'V', 'A', 'C', 'J', 'Gy', 'kg', 'sr', 'lm', 'W',
+  'N', 'Pa', 'T', 'lx', 'F', 'ohm', 'H', and 'kat'---the coherent SI units of
+  `BIPM.ini <BIPM-ini.html>`_ with distinct dimensions) - List of units that
+  are preferred as display units
+
+     Each of these is used in place of an equivalent compound display unit of
+     the same dimension without searching for the simplest representation.
+     If several units have the same dimension, the first one is used.  The
+     resulting dictionary (:attr:`~natu.core.Units.preferred_units`) can be
+     modified after the units have been loaded.
+
+- *snapshot_dir* (*None*) - Directory of snapshots of the loaded units
+
+     The definitions in the files are evaluated as the units are accessed.
+     If *snapshot_dir* is set (e.g., to ``~/.cache/natu``), the units and the
+     index of their coherent relations are saved there as a snapshot (see
+     :mod:`natu._snapshot`) once all of the definitions have been evaluated.
+     The snapshot is used instead in later sessions until the files, the
+     settings that affect them (*use_quantities*), or :mod:`natu` itself
+     change.  Restoring it takes a few milliseconds, so it only pays off in
+     programs that use most of the units (it saves evaluating the definitions
+     and reducing the relations, about 10 ms for the default files); a
+     program that uses only a few units may start slightly faster without
+     it.  A snapshot is a pickle, so it is only loaded if it is
+     owned by the current user and isn't writable by others.  Only use a
+     directory that other users can't write to.
 
 - *default_format* ('') - Default format for printing units and dimensions
 
@@ -91,10 +156,31 @@ del path, dname
 # True to track dimensions and display units:
 use_quantities = True
 
-# Number of non-minimizing substitutions that can be made in seeking the
-# best display unit:
+# 0 to turn off the simplification of display units:
 simplification_level = 1
 
+# True to simplify a display unit only when it is accessed:
+lazy_simplification = True
+
+# Maximum number of simplified display units that are remembered:
+simplification_cache_size = 1024
+
+# Maximum number of compiled unit formats that are remembered:
+format_cache_size = 1024
+
+# Maximum number of parsed string expressions that are remembered:
+parse_cache_size = 1024
+
+# Maximum number of compiled definitions that are remembered:
+expression_cache_size = 1024
+
+# Units that are preferred as display units:
+preferred_units = ['Hz', 'V', 'A', 'C', 'J', 'Gy', 'kg', 'sr', 'lm', 'W', 'N',
+                   'Pa', 'T', 'lx', 'F', 'ohm', 'H', 'kat']
+
+# Directory of snapshots of the loaded units (None to disable):
+snapshot_dir = None
+
 # Default format for printing units and dimensions
 default_format = ''
 
@@ -104,6 +104,8 @@ Classes in this module:
 - :class:`DimObject` - Base class that records physical dimension and display
   unit
 
+- :class:`Dimension` - Immutable, interned physical dimension
+
 - :class:`LambdaUnit` - Unit that involves an offset or other operations besides
   scaling
 
@@ -155,19 +157,30 @@ __copyright__ = ("Copyright 2013-2014, Kevin Davies, Hawaii Natural Energy "
                  "Institute, and Georgia Tech Research Corporation")
 __license__ = "BSD-compatible (see LICENSE.txt)"
 
-__all__ = ('CoherentRelations DimObject Quantity Unit ScalarUnit LambdaUnit '
-           'Units UnitsModule UnitExponents'.split())
+__all__ = ('CoherentRelations DimObject Dimension Quantity QuantityArray Unit '
+           'ScalarUnit LambdaUnit Units UnitsModule UnitExponents'.split())
 
 import math
 import re
+import sys
 
 from os.path import dirname
 from types import ModuleType
+from collections import OrderedDict
+from contextlib import contextmanager
+from fractions import Fraction
 from functools import wraps, reduce
+from threading import Lock, RLock
 # from warnings import warn
-from .util import format_e
+from .util import LRUCache, format_e
+from . import _snapshot
+from ._expressions import compile_expression
 from ._prefixes import PREFIXES
-from .config import simplification_level, use_quantities, unit_replacements
+from ._simplification import RelationIndex
+from .config import (format_cache_size, lazy_simplification,
+                     parse_cache_size, preferred_units, simplification_level,
+                     simplification_cache_size, snapshot_dir, use_quantities,
+                     unit_replacements)
 from .exponents import Exponents, split_code, u, i
 
 try:
@@ -178,6 +191,45 @@ except ImportError:
     from ConfigParser import (RawConfigParser, ParsingError,
                               Error as ConfigParserError)
 
+# Types of strings
+try:
+    _STRING_TYPES = (str, unicode)
+except NameError:
+    # Python 3
+    _STRING_TYPES = (str,)
+
+try:
+    from contextvars import ContextVar
+except ImportError:
+    # For Python < 3.7 (the variable is local to each thread, but not to each
+    # asyncio task):
+    from threading import local
+
+    class ContextVar(local):
+
+        """Thread-local substitute for :class:`contextvars.ContextVar`
+        """
+
+        def __init__(self, name, default=None):
+            # pylint: disable=I0011, W0231, W0613
+            self.value = default
+
+        def get(self):
+            """Return the value of the variable in the current thread."""
+            return self.value
+
+        def set(self, value):
+            """Set the value of the variable in the current thread and return
+            a token to restore the previous value.
+            """
+            token = self.value
+            self.value = value
+            return token
+
+        def reset(self, token):
+            """Restore the value of the variable from a token."""
+            self.value = token
+
 # Compile the formatted unit replacements.
 UNIT_REPLACEMENTS = {fmt:
                      [(re.compile(rpl[0]), rpl[1]) for rpl in rpls]
@@ -188,9 +240,37 @@ UNIT_REPLACEMENTS = {fmt:
 # allowed)
 unitspace = None
 
+# Display units of the current context by dimension or None (see
+# display_units())
+_display_preferences = ContextVar('display_preferences', default=None)
+
+# Base dimensions in the order that they index the vectors of Dimension
+# instances.  Other bases are appended as they are encountered.
+_BASE_DIMENSIONS = ['L', 'M', 'T', 'I', 'Theta', 'N', 'J', 'A']
+_BASE_INDICES = {base: i for i, base in enumerate(_BASE_DIMENSIONS)}
+
+# Types of values that are known not to be arrays (see _is_array())
+try:
+    _NUMBER_TYPES = frozenset([int, long, float, complex, bool])
+except NameError:
+    # For Python 3:
+    _NUMBER_TYPES = frozenset([int, float, complex, bool])
+
 # Standard functions
 # ------------------
 
+def _is_array(value):
+    """Return *True* if *value* is a NumPy_ array.
+
+    NumPy_ isn't imported here; if it hasn't been imported elsewhere, then
+    *value* can't be an array.
+
+
+    .. _NumPy: http://numpy.scipy.org/
+    """
+    numpy = sys.modules.get('numpy')
+    return numpy is not None and isinstance(value, numpy.ndarray)
+
 def assert_homogeneous(*args):
     r"""Assert that *\*args* have the same dimension.
 
@@ -206,9 +286,9 @@ def assert_homogeneous(*args):
     ...
     AssertionError: The quantities must have the same dimension.
     """
-    dim = dimension(args[0])
+    dim = _dimension(args[0])
     for arg in args[1:]:
-        assert dimension(arg) == dim, \
+        assert _dimension(arg) is dim, \
             "The quantities must have the same dimension."
 
 def value(x):
@@ -261,6 +341,16 @@ def dimension(quantity):
     except AttributeError:
         return Exponents()
 
+def _dimension(quantity):
+    """Return the internal :class:`Dimension` of *quantity* without copying it.
+
+    If *quantity* does not have a dimension, it is assumed to be dimensionless.
+    """
+    try:
+        return quantity._dimension
+    except AttributeError:
+        return DIMENSIONLESS
+
 def display_unit(quantity):
     """Return the display unit of *quantity*.
 
@@ -278,6 +368,68 @@ def display_unit(quantity):
     except AttributeError:
         return UnitExponents()
 
+@contextmanager
+def display_units(*args, units=None):
+    r"""Return a context manager that sets the display units used to format
+    quantities in the current context.
+
+    **Parameters:**
+
+    - *\*args*: Units (:class:`Unit` instances) or strings of units (compound
+      or not)
+
+         Each quantity with the same dimension as one of the units is
+         formatted in that unit instead of its own display unit.
+
+    - *units*: :class:`Units` dictionary used to interpret the strings
+
+         By default, it is the global one (loaded by :mod:`natu.units`).  The
+         display units from the strings are bound to it (see
+         :class:`UnitExponents`).
+
+    The display units of the quantities aren't changed.  The setting only
+    applies to the current thread or :mod:`asyncio` task, and the contexts
+    can be nested.
+
+    **Example:**
+
+    >>> from natu.units import m, ft, lbf
+    >>> with display_units(ft, 'lbf/inch2'):
+    ...     print(2*m)
+    ...     print(10*lbf/ft**2)
+    6.56168 ft
+    0.0694444 lbf/inch2
+    >>> print(2*m)
+    2 m
+
+    Using the units of another :class:`Units` dictionary:
+
+    >>> custom = Units()
+    >>> custom['furlong'] = 201.168*m
+    >>> with display_units('furlong', units=custom):
+    ...     print(1000*m)
+    4.97097 furlong
+    """
+    if units is None:
+        units = unitspace
+    preferences = dict(_display_preferences.get() or {})
+    for unit in args:
+        if isinstance(unit, Unit):
+            display_unit = unit._get_display_unit()
+            preferences[unit._dimension] = display_unit
+        else:
+            display_unit = UnitExponents(unit)
+            display_unit._units = units
+            dimension = DIMENSIONLESS
+            for symbol, exp in display_unit.items():
+                dimension += units[symbol]._dimension * exp
+            preferences[dimension] = display_unit
+    token = _display_preferences.set(preferences)
+    try:
+        yield
+    finally:
+        _display_preferences.reset(token)
+
 def merge(value, prototype):
     """Merge *value* into a new :class:`~natu.core.ScalarUnit` or
     :class:`~natu.core.Quantity` with the properties (:attr:`dimension`,
@@ -294,14 +446,15 @@ def merge(value, prototype):
     3.2808... ft
     """
     try:
-        dimension = prototype.dimension
+        dimension = prototype._dimension
     except AttributeError:
         return value
     try:
-        prefixable = prototype.prefixable
+        prefixable = prototype._prefixable
     except AttributeError:
-        return Quantity(value, dimension, prototype.display_unit)
-    return ScalarUnit(value, dimension, prototype.display_unit, prefixable)
+        return Quantity.quicknew(value, dimension, prototype._display_unit)
+    return ScalarUnit.quicknew(value, dimension, prototype._display_unit,
+                               prefixable)
 
 def prohibited(self, other):
     """Not allowed; raises a TypeError"""
@@ -321,6 +474,15 @@ def quantity_only(operation):
                         "quantity first.")
     return prohibited
 
+def _complexity(unit):
+    """Return the complexity of a unit (the objective of
+    :meth:`Units.simplify`).
+    """
+    # This is the L1 norm (sum of the absolute values of the exponents),
+    # making this problem integer L1 minimization.  See
+    # natu._simplification.RelationIndex for the solution.
+    return sum(map(abs, unit.values()))
+
 def _times(code):
     """Return a string representing multiplication, depending on the format
     code.
@@ -336,42 +498,76 @@ def _times(code):
 
 def add_unit(meth):
     """Decorate a method to add a unit to a formatted string.
+
+    The unit, its string, and the split format code are cached in
+    :attr:`Units.format_cache` by display unit and format code, so a repeated
+    format takes one division and one number format.
+
+    The display unit set by :func:`display_units` for the dimension, if any,
+    takes precedence over the quantity's display unit.
     """
     @wraps(meth)
     def wrapped(self, code):
-
-        # Modify self._display_unit to handle lambda units.
-        # If the display unit is compound, replace any lambda units with scalar
-        # units. If the display unit is a lambda unit raised to a power other
-        # than -1, 0, or 1, use a scalar unit instead.
-        display_unit = self._display_unit
-        n_units = len(display_unit)
-        for unit_str, exp in display_unit.items():
-            unit = unitspace[unit_str]
-            if isinstance(unit, LambdaUnit) and (n_units > 1
-                                                 or exp not in [-1, 0, 1]):
-                del display_unit[unit_str]
-                display_unit += unit._toquantity(1).display_unit * exp
-
-        # Create the ScalarUnit.
-        unit = unitspace(**display_unit)
+        preferences = _display_preferences.get()
+        if preferences and self._dimension in preferences:
+            display_unit = preferences[self._dimension]
+        else:
+            display_unit = self._get_display_unit()
+        units = _registry(display_unit)
+        format_cache = units.format_cache
+        key = (frozenset(display_unit.items()), code)
+        try:
+            unit, unit_dim, number_code, unit_code, unit_str = (
+                format_cache[key])
+        except KeyError:
+            revision = units._revision
+            unit, unit_dim, number_code, unit_code, unit_str = _compile_format(
+                display_unit, code)
+            with units._lock:
+                # Don't cache the format if the units have changed meanwhile.
+                if units._revision == revision:
+                    format_cache[key] = (unit, unit_dim, number_code,
+                                         unit_code, unit_str)
 
         # Check the dimension.
-        unit_dim = unit._dimension
-        assert self._dimension == unit_dim, ("The display unit "
+        assert self._dimension is unit_dim, ("The display unit "
             "({0.display_unit}) and the quantity have different dimensions "
             "({1} vs. {0.dimension}).").format(self, unit_dim)
 
-        # Parse the format code.
-        number_code, unit_code = split_code(code)
-
-        # Create the unit string.
-        unit_str = format(self.display_unit, unit_code)
-
         return meth(self / unit, number_code, unit_code) + unit_str
 
     return wrapped
 
+def _compile_format(display_unit, code):
+    """Return the unit, its dimension, the number and unit parts of the format
+    code, and the unit string for formatting a quantity with a display unit
+    (see :func:`add_unit`).
+    """
+    # Handle lambda units.
+    # If the display unit is compound, replace any lambda units with scalar
+    # units. If the display unit is a lambda unit raised to a power other
+    # than -1, 0, or 1, use a scalar unit instead.
+    units = _registry(display_unit)
+    n_units = len(display_unit)
+    for unit_str, exp in list(display_unit.items()):
+        unit = units[unit_str]
+        if isinstance(unit, LambdaUnit) and (n_units > 1
+                                             or exp not in [-1, 0, 1]):
+            display_unit = display_unit.copy()
+            del display_unit[unit_str]
+            display_unit += unit._toquantity(1).display_unit * exp
+
+    # Create the ScalarUnit.
+    unit = units(**display_unit)
+
+    # Parse the format code.
+    number_code, unit_code = split_code(code)
+
+    # Create the unit string.
+    unit_str = format(display_unit, unit_code)
+
+    return unit, _dimension(unit), number_code, unit_code, unit_str
+
 def as_scalarunit(meth):
     """Decorate a method to return a :class:`ScalarUnit` if both arguments are
     :class:`ScalarUnit` instances and the result is not dimensionless.
@@ -380,8 +576,8 @@ def as_scalarunit(meth):
     def wrapped(self, other):
         result = meth(self, other)
         if isinstance(other, ScalarUnit) and isinstance(result, Quantity):
-            return ScalarUnit(result._value, result._dimension,
-                              result._display_unit)
+            return ScalarUnit.quicknew(result._value, result._dimension,
+                                       result._display_unit)
         return result
 
     return wrapped
@@ -436,7 +632,12 @@ class UnitExponents(Exponents):
 
     This is :class:`natu.exponents.Exponents`, except that special replacements
     (see *unit_replacements* in mod:`~natu.config`) are made in certain
-    formatted strings.
+    formatted strings.  It is also bound to the :class:`Units` dictionary that
+    defines the units, which is used to simplify and format the display unit
+    (see :meth:`Units.load_ini`).  Copies and the results of arithmetic are
+    bound to the same dictionary.  By default, the dictionary is the one loaded
+    by :mod:`natu.units`.  The binding is kept when the display unit is pickled
+    (see :meth:`Units.__reduce__`) or deep-copied.
 
     **Example:**
 
@@ -448,6 +649,88 @@ class UnitExponents(Exponents):
     >>> print(format(unit, 'U'))
     Å² s⁻²
     """
+    # True if the unit has been simplified (see DimObject._get_display_unit())
+    _simplified = False
+
+    # Units dictionary that defines the units (None for the global unitspace)
+    _units = None
+
+    def copy(self):
+        """Return a shallow copy, bound to the same :class:`Units` dictionary.
+        """
+        # This bypasses Exponents.update(), which would try to parse the
+        # argument as a string.
+        copy = dict.__new__(self.__class__)
+        dict.update(copy, self)
+        if self._units is not None:
+            copy._units = self._units
+        return copy
+
+    def __deepcopy__(self, memo):
+        """Return a copy, bound to the same :class:`Units` dictionary (which
+        isn't copied).
+        """
+        return self.copy()
+
+    def __reduce__(self):
+        """Return the state for pickling, including the :class:`Units`
+        dictionary that the display unit is bound to.
+        """
+        if self._units is None:
+            return (self.__class__, (dict(self),))
+        return (self.__class__, (dict(self),), {'_units': self._units})
+
+    def __mul__(x, y):
+        """x.__mul__(y) <==> x*y"""
+        result = Exponents.__mul__(x, y)
+        if x._units is not None:
+            result._units = x._units
+        return result
+
+    __rmul__ = __mul__
+    __rmul__.__doc__ = "x.__rmul__(y) <==> y*x"
+
+    def __truediv__(x, y):
+        """x.__truediv__(y) <==> x/y"""
+        result = Exponents.__truediv__(x, y)
+        if x._units is not None:
+            result._units = x._units
+        return result
+
+    __div__ = __truediv__
+
+    def __neg__(x):
+        """x.__neg__() <==> -x"""
+        result = Exponents.__neg__(x)
+        if x._units is not None:
+            result._units = x._units
+        return result
+
+    def __add__(x, y):
+        """x.__add__(y) <==> x+y
+
+        If *x* isn't bound to a :class:`Units` dictionary, the result is bound
+        to the dictionary of *y*, if any.
+        """
+        result = Exponents.__add__(x, y)
+        if x._units is None:
+            result._units = getattr(y, '_units', None)
+        return result
+
+    __radd__ = __add__
+    __radd__.__doc__ = "x.__radd__(y) <==> y+x"
+
+    def __sub__(x, y):
+        """x.__sub__(y) <==> x-y
+
+        If *x* isn't bound to a :class:`Units` dictionary, the result is bound
+        to the dictionary of *y*, if any.
+        """
+        result = Exponents.__sub__(x, y)
+        if x._units is None:
+            result._units = getattr(y, '_units', None)
+        return result
+
     def __format__(self, format_code=''):
         """Format the UnitExponents instance according to format_code.
         """
@@ -459,6 +742,236 @@ class UnitExponents(Exponents):
             pass
         return unit_str
 
+def _module_units(name):
+    """Return the :class:`Units` dictionary of a :class:`UnitsModule` by the
+    name of the module (for unpickling; see :meth:`Units.__reduce__`).
+    """
+    __import__(name)
+    return sys.modules[name]._units
+
+def _registry(display_unit):
+    """Return the :class:`Units` dictionary that a display unit
+    (:class:`UnitExponents` instance) is bound to.
+    """
+    units = display_unit._units
+    return unitspace if units is None else units
+
+def _assert_same_registry(display_unit1, display_unit2):
+    """Assert that two display units are bound to the same :class:`Units`
+    dictionary.
+
+    A display unit that isn't bound (e.g., of a quantity created directly) is
+    compatible with any dictionary.
+    """
+    units1 = display_unit1._units
+    units2 = display_unit2._units
+    assert units1 is None or units2 is None or units1 is units2, (
+        "The quantities must be derived from the same units dictionary.")
+
+def _dimension_vector(exponents, add_bases=True):
+    """Return the exponents of a dimension as a tuple indexed by the base
+    dimensions, without trailing zeros.
+
+    Integral exponents are cast as :class:`int` so that equal dimensions have
+    equal vectors.  A base dimension that hasn't been used yet is added if
+    *add_bases* is *True* (which requires :attr:`Dimension._intern_lock`);
+    otherwise, a :class:`KeyError` is raised.
+    """
+    vector = [0] * len(_BASE_DIMENSIONS)
+    for base, exp in exponents.items():
+        if not exp:
+            continue
+        try:
+            i = _BASE_INDICES[base]
+        except KeyError:
+            if not add_bases:
+                raise
+            # New base dimension (listed before it is indexed, for the
+            # readers that don't hold the lock)
+            _BASE_DIMENSIONS.append(base)
+            i = _BASE_INDICES[base] = len(_BASE_DIMENSIONS) - 1
+        if i >= len(vector):
+            vector.extend([0] * (i + 1 - len(vector)))
+        vector[i] = int(exp) if exp % 1 == 0 else exp
+    while vector and not vector[-1]:
+        vector.pop()
+    return tuple(vector)
+
+def _immutable(self, *args, **kwargs):
+    """Not allowed; raises a TypeError"""
+    # pylint: disable=I0011, W0613
+    raise TypeError("Dimensions are immutable.")
+
+class Dimension(Exponents):
+
+    """Immutable, interned physical dimension
+
+    This is :class:`~natu.exponents.Exponents`, except that it can't be changed
+    and there is only one instance per dimension.  Internally, the exponents
+    are also recorded as a vector over the base dimensions (L, M, T, I, Theta,
+    N, J, and A, followed by any others in the order they are first used), and
+    the hash is precomputed.  Therefore, two dimensions are equal only if they
+    are the same object, and the results of addition, subtraction, negation,
+    and multiplication are tabulated upon first use.  A dimension created from
+    a string is also recorded by that string, so the string is only parsed
+    once.
+
+    The initialization signatures are the same as those of
+    :class:`~natu.exponents.Exponents`.  The in-place operators create new
+    instances.
+
+    **Examples:**
+
+    >>> Dimension('L/T') is Dimension(dict(L=1, T=-1))
+    True
+    >>> Dimension('L') - Dimension('T') is Dimension('L/T')
+    True
+    >>> print(Dimension('L*M/T2') + Dimension('L'))
+    L2*M/T2
+    >>> Dimension('L')['L'] = 2
+    Traceback (most recent call last):
+    ...
+    TypeError: Dimensions are immutable.
+    """
+
+    # Interned instances, keyed by vector
+    _interned = {}
+
+    # Interned instances, keyed by the strings that have been used to create
+    # them (bounded, since the strings may be arbitrary)
+    _by_string = LRUCache(parse_cache_size)
+
+    # Lock to create each interned instance only once, even if threads race
+    # (lookups don't take it)
+    _intern_lock = Lock()
+
+    def __new__(cls, *args, **kwargs):
+        """Return the interned instance for the dimension, creating it if
+        necessary.
+        """
+        if len(args) == 1 and not kwargs:
+            arg = args[0]
+            if isinstance(arg, Dimension):
+                return arg
+            if isinstance(arg, _STRING_TYPES):
+                try:
+                    return cls._by_string[arg]
+                except KeyError:
+                    new = cls(Exponents(arg))
+                    cls._by_string[arg] = new
+                    return new
+        # Look up the interned instance without the lock.  The lock is only
+        # taken to create an instance (or a base dimension), and the lookup is
+        # repeated under it in case another thread has just done so.
+        exponents = Exponents(*args, **kwargs)
+        try:
+            return cls._interned[_dimension_vector(exponents, False)]
+        except KeyError:
+            pass
+        with cls._intern_lock:
+            vector = _dimension_vector(exponents)
+            try:
+                return cls._interned[vector]
+            except KeyError:
+                pass
+            new = dict.__new__(cls)
+            dict.update(new, ((_BASE_DIMENSIONS[i], exp)
+                              for i, exp in enumerate(vector) if exp))
+            new._vector = vector
+            new._hash = hash(vector)
+            new._sums = {}  # Results of addition, keyed by the other term
+            new._differences = {}  # Results of subtraction, by subtrahend
+            new._multiples = {}  # Results of multiplication, keyed by factor
+            new._negative = None
+            cls._interned[vector] = new
+            return new
+
+    def __init__(self, *args, **kwargs):
+        """Do nothing; the instance is already initialized by :meth:`__new__`.
+        """
+        # pylint: disable=I0011, W0231
+        pass
+
+    def __hash__(self):
+        """x.__hash__() <==> hash(x)"""
+        return self._hash
+
+    def __eq__(x, y):
+        """x.__eq__(y) <==> x==y"""
+        if isinstance(y, Dimension):
+            return x is y
+        return Exponents.__eq__(x, y)
+
+    def __ne__(x, y):
+        """x.__ne__(y) <==> x!=y"""
+        if isinstance(y, Dimension):
+            return x is not y
+        return not x.__eq__(y)
+
+    def __add__(x, y):
+        """x.__add__(y) <==> x+y"""
+        try:
+            return x._sums[y]
+        except (KeyError, TypeError):
+            result = Dimension(Exponents.__add__(Exponents(x), y))
+            if isinstance(y, Dimension):
+                x._sums[y] = result
+            return result
+
+    __radd__ = __add__
+    __radd__.__doc__ = "x.__radd__(y) <==> y+x"
+
+    def __sub__(x, y):
+        """x.__sub__(y) <==> x-y"""
+        try:
+            return x._differences[y]
+        except (KeyError, TypeError):
+            result = Dimension(Exponents.__sub__(Exponents(x), y))
+            if isinstance(y, Dimension):
+                x._differences[y] = result
+            return result
+
+    def __rsub__(x, y):
+        """x.__rsub__(y) <==> y-x"""
+        return Dimension(Exponents.__sub__(Exponents(y), x))
+
+    def __mul__(x, y):
+        """x.__mul__(y) <==> x*y"""
+        try:
+            return x._multiples[y]
+        except KeyError:
+            result = x._multiples[y] = Exponents.__mul__(x, y)
+            return result
+        except TypeError:
+            return Exponents.__mul__(x, y)
+
+    __rmul__ = __mul__
+    __rmul__.__doc__ = "x.__rmul__(y) <==> y*x"
+
+    def __neg__(x):
+        """x.__neg__() <==> -x"""
+        if x._negative is None:
+            x._negative = Exponents.__neg__(x)
+        return x._negative
+
+    # The in-place operations create new instances.
+    __iadd__ = __add__
+    __isub__ = __sub__
+    __imul__ = __mul__
+
+    # No mutation
+    __setitem__ = _immutable
+    __delitem__ = _immutable
+    clear = _immutable
+    pop = _immutable
+    popitem = _immutable
+    setdefault = _immutable
+    subtract = _immutable
+    update = _immutable
+
+# The dimension of dimensionless objects
+DIMENSIONLESS = Dimension()
+
 class DefinitionError(Exception):
 
     """Error in the definition of a unit or constant in an INI file
@@ -468,9 +981,10 @@ class DefinitionError(Exception):
 # Note that in the DimObject below, dimension and display_unit are properties
 # that return copies of the internal _dimension and _display_unit attributes.
 # Generally, only dimension and display_unit should be accessed from the outside
-# to prevent mutating the internal _dimension and _display_unit dictionaries.
-# However, in the code below, this rule is strategically broken to avoid the
-# overhead of making copies.
+# to prevent mutating the internal _display_unit dictionary.  However, in the
+# code below, this rule is strategically broken to avoid the overhead of making
+# copies.  The internal _dimension is an interned Dimension instance, so it is
+# immutable and can be compared by identity.
 
 class DimObject(object):
 
@@ -498,16 +1012,46 @@ class DimObject(object):
     :attr:`dimension` and :attr:`dimensionless` are read-only attributes (see
     below), but :attr:`display_unit` can be set using the same format as the
     *display_unit* argument above.
+
+    The attributes are stored in slots rather than a per-instance
+    :attr:`__dict__`.  The physical dimension is an interned :class:`Dimension`
+    and the display unit is shared among the instances that are derived from
+    one another, so each instance only holds references.  On 64-bit CPython
+    3.11, a :class:`Quantity` occupies 56 bytes (versus 56 bytes plus a
+    104-byte :attr:`__dict__` for the former layout) excluding its value.
     """
 
+    __slots__ = ('_dimension', '_display_unit')
+
     def __init__(self, dimension, display_unit):
         """Initialize by setting the physical dimension and display unit.
 
         See the top-level class documentation.
         """
-        self._dimension = Exponents(dimension)
+        self._dimension = Dimension(dimension)
         self.display_unit = display_unit
 
+    def _copy(self):
+        """Return a shallow copy that shares the values of the attributes.
+
+        Since the display unit is replaced (not mutated) when it is set,
+        setting it on the copy doesn't affect the original.
+        """
+        cls = self.__class__
+        try:
+            names = _SLOT_NAMES[cls]
+        except KeyError:
+            names = _SLOT_NAMES[cls] = [
+                name for base in cls.__mro__
+                for name in base.__dict__.get('__slots__', ())]
+        new = object.__new__(cls)
+        for name in names:
+            try:
+                setattr(new, name, getattr(self, name))
+            except AttributeError:
+                pass  # Not set
+        return new
+
     @classmethod
     def quicknew(cls, dimension, display_unit):
         """Initialize by directly setting the physical dimension and display
@@ -515,21 +1059,26 @@ class DimObject(object):
 
         **Parameters:**
 
-        - *dimension*: Physical dimension as an
-          :class:`~natu.exponents.Exponents` instance
+        - *dimension*: Physical dimension as a :class:`Dimension` instance
 
         - *display_unit*: Display unit as a :class:`UnitExponents` instance
+
+             This may be shared with other instances, so it must not be
+             mutated.  It is simplified as described for the
+             :attr:`display_unit` setter.
         """
         new = cls.__new__(cls)
         new._dimension = dimension
         new._display_unit = display_unit
+        if not lazy_simplification:
+            new._get_display_unit()
         return new
 
     @property
     def dimension(self):
         """Physical dimension as an :class:`~natu.exponents.Exponents` instance
         """
-        return self._dimension.copy()
+        return Exponents(self._dimension)
 
     @property
     def dimensionless(self):
@@ -539,7 +1088,7 @@ class DimObject(object):
     @property
     def display_unit(self):
         """Display unit as an :class:`~natu.exponents.Exponents` instance"""
-        return self._display_unit.copy()
+        return self._get_display_unit().copy()
 
     @display_unit.setter
     def display_unit(self, display_unit):
@@ -551,8 +1100,39 @@ class DimObject(object):
 
         Here, the display unit is not checked for dimensional consistency (with
         :attr:`dimension`).
+
+        The display unit stays bound to the same :class:`Units` dictionary (see
+        :class:`UnitExponents`).
+
+        If *lazy_simplification* is *True* in :mod:`natu.config`, then the
+        display unit is simplified when it is first accessed instead of here.
         """
-        self._display_unit = unitspace.simplify(UnitExponents(display_unit))
+        new = UnitExponents(display_unit)
+        try:
+            units = self._display_unit._units
+        except AttributeError:
+            # The display unit is being initialized.
+            units = getattr(display_unit, '_units', None)
+        if units is not None:
+            new._units = units
+        self._display_unit = new
+        if not lazy_simplification:
+            self._get_display_unit()
+
+    def _get_display_unit(self):
+        """Simplify the internal display unit if it hasn't been already and
+        return it (not a copy).
+        """
+        display_unit = self._display_unit
+        if not display_unit._simplified:
+            units = display_unit._units
+            display_unit = _registry(display_unit).simplify(
+                display_unit, dimension=self._dimension)
+            if units is not None:
+                display_unit._units = units
+            display_unit._simplified = True
+            self._display_unit = display_unit
+        return display_unit
 
 class Quantity(DimObject):
 
@@ -618,6 +1198,16 @@ class Quantity(DimObject):
     .. _Python: https://www.python.org/
     """
 
+    __slots__ = ('_value',)
+
+    def __new__(cls, value=None, *args, **kwargs):
+        """Create an instance of :class:`QuantityArray` instead of
+        :class:`Quantity` if *value* is a NumPy array.
+        """
+        if cls is Quantity and _is_array(value):
+            cls = QuantityArray
+        return object.__new__(cls)
+
     def __init__(self, value, dimension, display_unit):
         """Initialize a quantity by setting the value, physical dimension, and
         display unit.
@@ -638,15 +1228,25 @@ class Quantity(DimObject):
              unit.  It is independent of the unit since the number scales
              inversely to the unit.
 
-        - *dimension*: Physical dimension as an
-          :class:`~natu.exponents.Exponents` instance
+        - *dimension*: Physical dimension as a :class:`Dimension` instance
 
         - *display_unit*: Display unit as a :class:`UnitExponents` instance
+
+             This may be shared with other instances, so it must not be
+             mutated.  It is simplified as described for the
+             :attr:`display_unit` setter.
+
+        If *value* is a NumPy array, the result is a :class:`QuantityArray`.
         """
-        new = cls.__new__(cls)
+        if (type(value) not in _NUMBER_TYPES and cls is Quantity
+                and _is_array(value)):
+            cls = QuantityArray
+        new = object.__new__(cls)
         new._value = value
         new._dimension = dimension
         new._display_unit = display_unit
+        if not lazy_simplification:
+            new._get_display_unit()
         return new
 
     @copy_props
@@ -685,50 +1285,86 @@ class Quantity(DimObject):
 
     def __mul__(x, y):
         """x.__mul__(y) <==> x*y
+
+        If *y* has a true class attribute :attr:`_quantities_defer` (e.g.,
+        :class:`LambdaUnit` and the classes of :mod:`natu.mixed`), then the
+        product, quotient, or matrix product is left to the reflected operator
+        of *y*.
         """
-        try:
+        if isinstance(y, Quantity):
+            if x._display_unit._units is not y._display_unit._units:
+                _assert_same_registry(x._display_unit, y._display_unit)
             value = x._value * y._value # Product of quantities
-        except AttributeError:
-            if isinstance(y, LambdaUnit):
-                return NotImplemented  # Defer to LambdaUnit's _toquantity().
-            return Quantity(x._value * y, x.dimension, x.display_unit)
-        dimension = x._dimension + y._dimension
-        if dimension:
-            return Quantity(value, dimension, x._display_unit + y._display_unit)
-        return value
+            dimension = x._dimension + y._dimension
+            if dimension:
+                return Quantity.quicknew(value, dimension,
+                                         x._display_unit + y._display_unit)
+            return value
+        if getattr(y, '_quantities_defer', False):
+            # Defer (e.g., to LambdaUnit's _toquantity()).
+            return NotImplemented
+        return Quantity.quicknew(x._value * y, x._dimension, x._display_unit)
 
     __rmul__ = __mul__
 
     def __truediv__(x, y):
         """x.__truediv__(y) <==> x/y
         """
-        try:
+        if isinstance(y, Quantity):
+            if x._display_unit._units is not y._display_unit._units:
+                _assert_same_registry(x._display_unit, y._display_unit)
             value = x._value / y._value
-        except AttributeError:
-            if isinstance(y, LambdaUnit):
-                return NotImplemented  # Deferto LambdaUnit's _tonumber().
-            return Quantity(x._value / y, x.dimension, x.display_unit)
-        dimension = x._dimension - y._dimension
-        if dimension:
-            return Quantity(value, dimension, x._display_unit - y._display_unit)
-        return value
+            dimension = x._dimension - y._dimension
+            if dimension:
+                return Quantity.quicknew(value, dimension,
+                                         x._display_unit - y._display_unit)
+            return value
+        if getattr(y, '_quantities_defer', False):
+            return NotImplemented  # Defer (e.g., to LambdaUnit's _tonumber()).
+        return Quantity.quicknew(x._value / y, x._dimension, x._display_unit)
 
     __div__ = __truediv__
 
     def __rtruediv__(x, y):
         """x.__rtruediv__(y) <==> y/x
         """
-        try:
+        if isinstance(y, Quantity):
+            if x._display_unit._units is not y._display_unit._units:
+                _assert_same_registry(x._display_unit, y._display_unit)
             value = y._value / x._value
-        except AttributeError:
-            return Quantity(y / x._value, -x._dimension, -x._display_unit)
-        dimension = y._dimension - x._dimension
-        if dimension:
-            return Quantity(value, dimension, y._display_unit - x._display_unit)
-        return value
+            dimension = y._dimension - x._dimension
+            if dimension:
+                return Quantity.quicknew(value, dimension,
+                                         y._display_unit - x._display_unit)
+            return value
+        return Quantity.quicknew(y / x._value, -x._dimension, -x._display_unit)
 
     __rdiv__ = __rtruediv__
 
+    def __matmul__(x, y):
+        """x.__matmul__(y) <==> x@y
+
+        This is :func:`numpy.matmul` (see :meth:`__array_ufunc__`).
+
+        **Example:**
+
+        >>> import numpy as np
+        >>> from natu.units import m
+        >>> x = np.array([1, 2])*m
+        >>> print(x @ x)
+        5 m2
+        """
+        if getattr(y, '_quantities_defer', False):
+            return NotImplemented  # Defer (e.g., to QuantityMatrix).
+        from numpy import matmul # Only available with NumPy
+        return matmul(x, y)
+
+    def __rmatmul__(x, y):
+        """x.__rmatmul__(y) <==> y@x
+        """
+        from numpy import matmul # Only available with NumPy
+        return matmul(y, x)
+
     @copy_props
     def __getitem__(self, item):
         """Index the value and put it in a new quantity with the same dimension
@@ -756,8 +1392,9 @@ class Quantity(DimObject):
 
         .. _NumPy: http://numpy.scipy.org/
         """
-        if '_value' not in dir(self):
-            raise AttributeError()
+        if attr == '_value':
+            # The slot hasn't been set (e.g., during unpickling).
+            raise AttributeError(attr)
         attr_value = getattr(self._value, attr)
         if callable(attr_value):
             def new_meth(*args, **kwargs):
@@ -777,6 +1414,48 @@ class Quantity(DimObject):
             raise TypeError(
                 "object of type '%s' has no len()" % self.__class__.__name__)
 
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """Apply a NumPy_ universal function (ufunc) to quantities.
+
+        The dimensions of the arguments are checked and the dimension and
+        display unit of the result are determined once per call according to
+        the rules in :mod:`natu._ufuncs`.  The ufunc itself operates on the
+        values, so array math runs at the speed of NumPy_.
+
+        **Example:**
+
+        >>> import numpy as np
+        >>> from natu.units import m, s
+        >>> print(np.divide(np.array([2, 4])*m, 2*s))
+        [1. 2.] m/s
+
+
+        .. _NumPy: http://numpy.scipy.org/
+        """
+        from ._ufuncs import apply # Only available with NumPy
+        return apply(ufunc, method, inputs, kwargs)
+
+    def __array_function__(self, func, types, args, kwargs):
+        """Apply a NumPy_ function (e.g., :func:`numpy.sum`) to quantities.
+
+        The dimensions of the arguments are checked and the dimension and
+        display unit of the result are determined once per call according to
+        the rules in :mod:`natu._array_functions`.  Functions without rules
+        aren't supported.
+
+        **Example:**
+
+        >>> import numpy as np
+        >>> from natu.units import m
+        >>> print(np.sum(np.array([1, 2])*m))
+        3 m
+
+
+        .. _NumPy: http://numpy.scipy.org/
+        """
+        from ._array_functions import apply # Only available with NumPy
+        return apply(func, types, args, kwargs)
+
     def __pow__(x, y):
         """x.__pow__(y) <==> pow(x, y)
 
@@ -824,7 +1503,8 @@ class Quantity(DimObject):
         """
         try:
             return format(self, 'g')
-        except ValueError:
+        except (TypeError, ValueError):
+            # The value doesn't support the code (e.g., it is an array).
             return format(self)
 
     def __int__(self):
@@ -862,7 +1542,7 @@ class Quantity(DimObject):
         dimension.
         """
         try:
-            return (x._dimension == y._dimension and
+            return (x._dimension is y._dimension and
                     x._value == y._value)
         except AttributeError:
             return x.dimensionless and x._value == y
@@ -876,7 +1556,7 @@ class Quantity(DimObject):
         of dimension.
         """
         try:
-            return (x._dimension != y._dimension or
+            return (x._dimension is not y._dimension or
                     x._value != y._value)
         except AttributeError:
             return not x.dimensionless or x._value != y
@@ -906,13 +1586,11 @@ class Quantity(DimObject):
         """
         return x > y
 
-    # TODO: Allow mixed-dimension NumPy arrays display with this check enabled.
-    #@homogeneous
+    @homogeneous
     def __lt__(x, y):
         """x.__lt__(y) <==> x<y
         """
-        #return x < y
-        return value(x) < value(y)
+        return x < y
 
     @homogeneous
     def __divmod__(x, y):
@@ -951,6 +1629,169 @@ class Quantity(DimObject):
         return y % x
 
 
+def _view_method(name):
+    """Return a method that applies the method *name* of the array and keeps
+    the dimension and display unit.
+    """
+    def method(self, *args, **kwargs):
+        return self._derive(getattr(self._value, name)(*args, **kwargs))
+    method.__name__ = name
+    method.__doc__ = ("Apply :meth:`numpy.ndarray.%s` to the value and keep "
+                      "the dimension and display unit." % name)
+    return method
+
+def _numpy_method(name):
+    """Return a method that applies the NumPy_ function *name* to the array
+    (see :meth:`Quantity.__array_function__`).
+
+
+    .. _NumPy: http://numpy.scipy.org/
+    """
+    def method(self, *args, **kwargs):
+        return getattr(sys.modules['numpy'], name)(self, *args, **kwargs)
+    method.__name__ = name
+    method.__doc__ = ("Apply :func:`numpy.%s` with the dimension rules of "
+                      ":mod:`natu._array_functions`." % name)
+    return method
+
+
+class QuantityArray(Quantity):
+
+    """Class to represent an array of physical quantities with one dimension
+    and display unit
+
+    The value is a NumPy_ array.  The dimension and display unit are stored
+    once for the array and shared by the views, slices, and reshaped arrays
+    derived from it, so those operations involve no work on the dimension or
+    display unit (and the values aren't copied unless NumPy_ copies them).
+
+    A quantity is created as an instance of this class if its value is an
+    array, whether it is initialized directly (as :class:`Quantity` or this
+    class) or derived (e.g., as the product of an array and a unit).  The
+    initialization parameters are the same as for :class:`Quantity`.  Unlike
+    other quantities, arrays are mutable; items can be set to quantities of the
+    same dimension.
+
+    **Example:**
+
+    >>> import numpy as np
+    >>> from natu.core import value
+    >>> from natu.units import m, s
+    >>> x = np.arange(6.)*m
+    >>> type(x).__name__
+    'QuantityArray'
+    >>> type(Quantity(np.arange(6.), 'L', 'm')).__name__
+    'QuantityArray'
+    >>> y = x.reshape(2, 3)[:, 1:]
+    >>> print(y)
+    [[1. 2.]
+     [4. 5.]] m
+    >>> np.shares_memory(value(x), value(y))
+    True
+    >>> print(y[1, 0])
+    4 m
+    >>> y[0] = np.array([10, 20])*m
+    >>> print(x.sum())
+    42 m
+    >>> y[0] = 1*s
+    Traceback (most recent call last):
+    ...
+    AssertionError: The quantities must have the same dimension.
+
+
+    .. _NumPy: http://numpy.scipy.org/
+    """
+
+    __slots__ = ()
+
+    def _derive(self, value):
+        """Return a quantity with *value* and the dimension and display unit of
+        this array.
+
+        The result is another :class:`QuantityArray` if *value* is an array.
+        The display unit is shared as is (without any simplification).
+        """
+        cls = QuantityArray if _is_array(value) else Quantity
+        new = object.__new__(cls)
+        new._value = value
+        new._dimension = self._dimension
+        new._display_unit = self._display_unit
+        return new
+
+    def __getitem__(self, item):
+        """Index the array.
+
+        The result is a view of the array (for a slice) or a scalar quantity
+        (for an item).
+        """
+        return self._derive(self._value[item])
+
+    def __setitem__(self, item, x):
+        """Set items of the array to *x*, which must have the same dimension.
+        """
+        assert_homogeneous(self, x)
+        self._value[item] = value(x)
+
+    def __iter__(self):
+        """Iterate over the first axis of the array."""
+        for item in self._value:
+            yield self._derive(item)
+
+    @property
+    def shape(self):
+        """Shape of the array"""
+        return self._value.shape
+
+    @property
+    def ndim(self):
+        """Number of dimensions of the array (not physical dimensions)"""
+        return self._value.ndim
+
+    @property
+    def size(self):
+        """Number of items in the array"""
+        return self._value.size
+
+    @property
+    def dtype(self):
+        """Data type of the values"""
+        return self._value.dtype
+
+    @property
+    def T(self):
+        """Transposed array (a view)"""
+        return self._derive(self._value.T)
+
+    # Methods that keep the dimension and display unit
+    reshape = _view_method('reshape')
+    ravel = _view_method('ravel')
+    flatten = _view_method('flatten')
+    transpose = _view_method('transpose')
+    swapaxes = _view_method('swapaxes')
+    squeeze = _view_method('squeeze')
+    copy = _view_method('copy')
+    astype = _view_method('astype')
+
+    # Methods that follow the dimension rules of natu._array_functions
+    sum = _numpy_method('sum')
+    prod = _numpy_method('prod')
+    cumsum = _numpy_method('cumsum')
+    mean = _numpy_method('mean')
+    std = _numpy_method('std')
+    var = _numpy_method('var')
+    min = _numpy_method('min')
+    max = _numpy_method('max')
+    argmin = _numpy_method('argmin')
+    argmax = _numpy_method('argmax')
+    argsort = _numpy_method('argsort')
+    clip = _numpy_method('clip')
+    round = _numpy_method('round')
+    dot = _numpy_method('dot')
+    nonzero = _numpy_method('nonzero')
+
+del _view_method, _numpy_method
+
+
 class Unit(DimObject):
 
     """Base class for a unit
@@ -979,8 +1820,13 @@ class Unit(DimObject):
     :attr:`prefixable` are read-only attributes, but
     :attr:`~DimObject.display_unit` can be set using the same format as the
     *display_unit* argument above.
+
+    The *prefixable* flag is stored in a slot of each concrete subclass so that
+    :class:`ScalarUnit` can derive from both :class:`Quantity` and this class.
     """
 
+    __slots__ = ()
+
     def __init__(self, dimension, display_unit, prefixable=False):
         """Initialize by setting the dimension, display unit, and prefixable
         flag.
@@ -1057,9 +1903,12 @@ class ScalarUnit(Quantity, Unit):
 
     Now any quantity generated from the metre (m) will display in feet (ft)
     instead. However, the value is unchanged; the metre still represents the
-    same length.
+    same length.  To display lengths in feet only within the current context
+    (e.g., thread), use :func:`display_units` instead.
     """
 
+    __slots__ = ('_prefixable',)
+
     def __init__(self, value, dimension, display_unit={}, prefixable=False):
         """Initialize a scalar unit by setting the value, physical dimension,
         display unit, and prefixable flag.
@@ -1074,12 +1923,25 @@ class ScalarUnit(Quantity, Unit):
         # Set the dimension, display unit, and prefixable flag.
         Unit.__init__(self, dimension, display_unit, prefixable)
 
+    @classmethod
+    def quicknew(cls, value, dimension, display_unit, prefixable=False):
+        """Initialize by directly setting the value, physical dimension,
+        display unit, and prefixable flag.
+
+        See :meth:`Quantity.quicknew`.
+        """
+        # pylint: disable=I0011, W0221
+        new = Quantity.quicknew.__func__(cls, value, dimension, display_unit)
+        new._prefixable = prefixable
+        return new
+
     @classmethod
     def from_quantity(cls, quantity, display_unit, prefixable=False):
         """Convert a quantity (instance of :class:`Quantity`) to a scalar unit.
 
         The value and dimension are taken from *quantity*.  The display unit
-        must be provided (via *display_unit*).
+        must be provided (via *display_unit*).  A new instance is returned;
+        *quantity* is not modified.
 
         **Example:**
 
@@ -1092,10 +1954,10 @@ class ScalarUnit(Quantity, Unit):
            >>> shake
            ScalarUnit(1e-08, 'T', 'shake', False) (shake)
         """
-        quantity.__class__ = cls
-        quantity.display_unit = display_unit
-        quantity._prefixable = prefixable
-        return quantity
+        unit = cls.quicknew(quantity._value, quantity._dimension,
+                            quantity._display_unit, prefixable)
+        unit.display_unit = display_unit
+        return unit
 
     def __repr__(self):
         """Return a string representation of the scalar unit.
@@ -1105,7 +1967,7 @@ class ScalarUnit(Quantity, Unit):
         the product of a number and a unit.
         """
         # Run this first to simplify self.display (see Units.load_ini):
-        desc = "ScalarUnit %s" % self._display_unit
+        desc = "ScalarUnit %s" % self._get_display_unit()
         desc = ("dimensionless {}" if self.dimensionless else
                 "{} with dimension %s" % self._dimension).format(desc)
         desc += " (prefixable)" if self._prefixable else " (not prefixable)"
@@ -1185,6 +2047,12 @@ class LambdaUnit(Unit):
 
     - *prefixable*: *True* if the unit can be prefixed
 
+    A lambda unit can also be declared as affine (a scale and an offset) or
+    logarithmic (a base and a reference) via :meth:`affine` or
+    :meth:`logarithmic`.  Then its prefixed versions are declared the same way,
+    and :func:`conversion` fuses a conversion among such units into a single
+    multiply-add.
+
     **Examples:**
 
     >>> from natu.units import degC, K
@@ -1192,8 +2060,25 @@ class LambdaUnit(Unit):
     LambdaUnit(...)
     >>> 25*degC/K
     298.15
+
+    Arrays are mapped as a whole:
+
+    >>> import numpy as np
+    >>> T = np.array([0, 25, 100])*degC
+    >>> T/K
+    array([273.15, 298.15, 373.15])
     """
 
+    __slots__ = ('_prefixable', '_toquantity', '_tonumber', '_transform')
+
+    # Make NumPy defer to __rmul__ and __rtruediv__ so that arrays are mapped
+    # as a whole (not element by element).
+    __array_ufunc__ = None
+
+    # Make quantities defer to __rmul__ and __rtruediv__ (see
+    # Quantity.__mul__).
+    _quantities_defer = True
+
     def __init__(self, toquantity, tonumber, dimension, display_unit='',
                  prefixable=False):
         """Initialize a lambda unit by setting the function and its inverse,
@@ -1206,13 +2091,118 @@ class LambdaUnit(Unit):
         self._toquantity = toquantity
         self._tonumber = tonumber
 
+        # The methods aren't declared as a transform (see _fromtransform()).
+        self._transform = None
+
         # Set the dimension, display unit, and prefixable flag.
         Unit.__init__(self, dimension, display_unit, prefixable)
 
+    @classmethod
+    def affine(cls, scale, offset=0, prefixable=False):
+        r"""Create a lambda unit that maps a number *n* to the quantity
+        *n*\*\ *scale* + *offset*.
+
+        **Parameters:**
+
+        - *scale*: Quantity (or number) that the number is multiplied by
+
+        - *offset*: Quantity (or number) that is added, with the same dimension
+          as *scale*
+
+        - *prefixable*: *True* if the unit can be prefixed
+
+        The unit doesn't have a display unit.  In a \*.ini file, it takes its
+        symbol as the display unit, e.g.,
+        ``degC = affine(K, 273.15*K), True``.
+
+        **Example:**
+
+        >>> from natu.units import K
+        >>> kelvin_offset = LambdaUnit.affine(K, 273.15*K)
+        >>> 25*kelvin_offset/K
+        298.15
+        """
+        dimension = _dimension(scale)
+        if offset:
+            assert _dimension(offset) is dimension, (
+                "The scale and offset must have the same dimension.")
+        return cls._fromtransform((value(scale), value(offset), None),
+                                  dimension, {}, prefixable)
+
+    @classmethod
+    def logarithmic(cls, base, reference=1, prefixable=False):
+        r"""Create a lambda unit that maps a number *n* to the quantity
+        *reference*\*\ *base*\*\*\ *n*.
+
+        **Parameters:**
+
+        - *base*: Base of the logarithm (a number)
+
+        - *reference*: Quantity (or number) that corresponds to zero
+
+        - *prefixable*: *True* if the unit can be prefixed
+
+        As for :meth:`affine`, the unit takes its symbol as the display unit in
+        a \*.ini file (e.g., ``B = logarithmic(10), True``).
+
+        **Example:**
+
+        >>> bel = LambdaUnit.logarithmic(10)
+        >>> 1000/bel
+        3.0
+        """
+        return cls._fromtransform(
+            (1, _logarithm(base)(value(reference)), base),
+            _dimension(reference), {}, prefixable)
+
+    @classmethod
+    def _fromtransform(cls, transform, dimension, display_unit,
+                       prefixable=False):
+        r"""Create a lambda unit that is declared by a transform.
+
+        *transform* is a tuple of a scale, an offset, and a base.  A number *n*
+        is mapped to the coordinate *n*\*scale + offset, which is the value of
+        the quantity if the base is *None* (affine) or the logarithm of the
+        value in the base otherwise (logarithmic).  *dimension* is a
+        :class:`Dimension`.
+        """
+        # pylint: disable=I0011, R0913
+        scale, offset, base = transform
+        if base is not None:
+            power, logarithm = _power(base), _logarithm(base)
+        identity = scale == 1 and offset == 0 # E.g., B
+
+        def toquantity(number):
+            """Map a number to a quantity."""
+            if isinstance(number, Quantity):
+                number = number._value # Dimensionless
+            coordinate = number if identity else number*scale + offset
+            number = coordinate if base is None else power(coordinate)
+            if dimension:
+                return Quantity.quicknew(number, dimension,
+                                         unit._get_display_unit())
+            return number
+
+        def tonumber(quantity):
+            """Map a quantity to a number."""
+            if isinstance(quantity, Quantity):
+                assert quantity._dimension is dimension, (
+                    "The quantities must have the same dimension.")
+                quantity = quantity._value
+            else:
+                assert not dimension
+            coordinate = quantity if base is None else logarithm(quantity)
+            # The offset is subtracted first to avoid cancellation.
+            return coordinate if identity else (coordinate - offset)/scale
+
+        unit = cls(toquantity, tonumber, dimension, display_unit, prefixable)
+        unit._transform = transform
+        return unit
+
     def __repr__(self):
         """Return a string represention of the lambda unit.
         """
-        desc = "LambdaUnit %s" % self._display_unit
+        desc = "LambdaUnit %s" % self._get_display_unit()
         desc = ("dimensionless {}" if self.dimensionless else
                 "{} with dimension %s" % self._dimension).format(desc)
         desc += " (prefixable)" if self._prefixable else " (not prefixable)"
@@ -1238,14 +2228,18 @@ class LambdaUnit(Unit):
 
     def __rmul__(unit, number):
         """unit.__rmul__(number) <==> number*unit
+
+        *number* may be a NumPy_ array, in which case the lambda function
+        should map the whole array at once.  The display unit of the result is
+        determined once per call.
         """
-        display_unit = unit.display_unit
+        display_unit = unit._get_display_unit()
         if isinstance(number, Quantity):
             assert not isinstance(number, Unit), (
                 "Lambda units can't be combined with other units.")
             assert number.dimensionless, (
                 "The argument to the lambda unit must be dimensionless.")
-            display_unit += number.display_unit
+            display_unit = display_unit + number._display_unit
             as_quantity = False
         else:
             as_quantity = bool(display_unit) and use_quantities
@@ -1255,18 +2249,19 @@ class LambdaUnit(Unit):
             raise AssertionError("The number isn't a valid argument for the "
                                  "lambda unit.")
         if isinstance(quantity, Quantity):
-            quantity.display_unit = display_unit
-            return quantity
+            return _redisplay(quantity, display_unit)
         elif as_quantity:
-            return Quantity(quantity, {}, display_unit)
+            return Quantity.quicknew(quantity, DIMENSIONLESS, display_unit)
         return quantity
 
     def __rtruediv__(unit, quantity):
         """unit.__rtruediv__(quantity) <==> quantity/unit
+
+        As for :meth:`__rmul__`, *quantity* may have an array value.
         """
         display_unit = -unit._display_unit
         if isinstance(quantity, Quantity):
-            display_unit += quantity.display_unit
+            display_unit = display_unit + quantity._display_unit
             as_quantity = False
         else:
             as_quantity = display_unit and unit.dimensionless and use_quantities
@@ -1279,12 +2274,11 @@ class LambdaUnit(Unit):
             assert number.dimensionless, ("The result of the inverse of the "
                                           "lambda unit should be "
                                           "dimensionless.")
-            number.display_unit = display_unit
-            return number
+            return _redisplay(number, display_unit)
         elif as_quantity:
             # E.g., keep unit of B-1 when doing 1/B but not unit of K/degC when
             # doing 300*K/degC.
-            return Quantity(number, {}, display_unit)
+            return Quantity.quicknew(number, DIMENSIONLESS, display_unit)
         return number
 
     __rdiv__ = __rtruediv__
@@ -1337,6 +2331,174 @@ class LambdaUnit(Unit):
     __abs__ = quantity_only('Absolute value')
 
 
+def _provided():
+    r"""Return a dictionary of constants, functions, and classes for use in the
+    \*.ini files.
+    """
+    from fractions import Fraction
+    sqrt = lambda x: x**Fraction(0.5)
+    # (Not using natu.math.sqrt to avoid cyclic import.)
+    return dict(pi=math.pi, exp=_vectorized('exp'), log=_vectorized('log'),
+                log10=_vectorized('log10'), sqrt=sqrt, Quantity=Quantity,
+                ScalarUnit=ScalarUnit, affine=LambdaUnit.affine,
+                logarithmic=LambdaUnit.logarithmic)
+
+
+def _vectorized(name):
+    """Return a function from :mod:`math` that also accepts NumPy_ arrays and
+    quantities with array values (by applying the NumPy_ ufunc of the same
+    name).
+
+    **Example:**
+
+    >>> import numpy as np
+    >>> log10 = _vectorized('log10')
+    >>> log10(100)
+    2.0
+    >>> log10(np.array([1, 10, 100]))
+    array([0., 1., 2.])
+
+
+    .. _NumPy: http://numpy.scipy.org/
+    """
+    scalar_func = getattr(math, name)
+
+    def func(x):
+        """Apply the function to a number or, elementwise, to an array."""
+        if _is_array(x) or isinstance(x, QuantityArray):
+            return getattr(sys.modules['numpy'], name)(x)
+        return scalar_func(x)
+    func.__name__ = name
+    return func
+
+
+def _power(base):
+    """Return a function that raises *base* to a power (number or array)."""
+    if base == math.e:
+        return _vectorized('exp')
+    return lambda exponent: base**exponent
+
+
+def _logarithm(base):
+    """Return a function that takes the logarithm of a number or array in
+    *base*.
+
+    The functions for bases e and 10 are used directly to avoid round-off
+    (e.g., log10(1000) is 3.0, but log(1000)/log(10) isn't).
+    """
+    if base == math.e:
+        return _vectorized('log')
+    if base == 10:
+        return _vectorized('log10')
+    log, factor = _vectorized('log'), 1/math.log(base)
+    return lambda x: log(x)*factor
+
+
+def _transform(unit):
+    """Return the transform of a unit as a tuple of a scale, an offset, and a
+    base (see :meth:`LambdaUnit._fromtransform`) or *None* if the unit isn't
+    declared by a transform.
+
+    A scalar unit (or a number) is affine with an offset of zero.
+    """
+    if isinstance(unit, LambdaUnit):
+        return unit._transform
+    return value(unit), 0, None
+
+
+def conversion(from_unit, to_unit):
+    """Return a function that converts a number (or array) expressed in one
+    unit (*from_unit*) to a number expressed in another (*to_unit*).
+
+    The units must have the same dimension.  If both are scalar units or lambda
+    units declared via :meth:`LambdaUnit.affine`, or both are declared via
+    :meth:`LambdaUnit.logarithmic`, then the conversion is fused into a single
+    multiply-add that is precomputed here.  Otherwise, the function multiplies
+    by *from_unit* and divides by *to_unit*.
+
+    The fused factor and offset are computed in rational arithmetic from the
+    transforms of the units.  If the number in *from_unit* that maps to zero
+    in *to_unit* is representable (e.g., 32 for degF to degC), then the
+    function pivots on it, so that point maps to exactly zero.  Otherwise, it
+    multiplies and adds, so that zero maps exactly to the offset (e.g., 32 for
+    degC to degF).  Elsewhere, the result is subject to the usual floating
+    point rounding.
+
+    **Example:**
+
+    >>> from natu.units import degC, degF, K, dB, B
+    >>> f2c = conversion(degF, degC)
+    >>> f2c(32)
+    0.0
+    >>> f2c(212)
+    100.0
+    >>> conversion(degC, degF)(0)
+    32.0
+    >>> conversion(degC, K)(25)
+    298.15
+    >>> conversion(B, dB)(3)
+    30.0
+    """
+    assert _dimension(from_unit) is _dimension(to_unit), (
+        "The units must have the same dimension.")
+    transform1 = _transform(from_unit)
+    transform2 = _transform(to_unit)
+    if (transform1 is None or transform2 is None
+            or (transform1[2] is None) != (transform2[2] is None)):
+        return lambda number: (number*from_unit)/to_unit
+    scale1, offset1, base1 = transform1
+    scale1, offset1 = _rational(scale1), _rational(offset1)
+    scale2, offset2, base2 = transform2
+    scale2, offset2 = _rational(scale2), _rational(offset2)
+    if base1 != base2:
+        # Express the logarithm of the first unit in the base of the second.
+        ratio = _rational(math.log(base1)/math.log(base2))
+        scale1, offset1 = scale1*ratio, offset1*ratio
+    factor = float(scale1/scale2)
+    pivot = (offset2 - offset1)/scale1
+    if Fraction(float(pivot)) == pivot:
+        pivot = float(pivot)
+        return lambda number: (number - pivot)*factor
+    offset = float((offset1 - offset2)/scale2)
+    return lambda number: number*factor + offset
+
+
+def _rational(number):
+    """Return the simplest fraction that rounds to a float *number*.
+
+    This recovers the exact values of factors like 5/9 from their rounded
+    floats.
+
+    **Example:**
+
+    >>> _rational(5/9)
+    Fraction(5, 9)
+    """
+    fraction = Fraction(number).limit_denominator(10**6)
+    return fraction if float(fraction) == number else Fraction(number)
+
+
+def _redisplay(quantity, display_unit):
+    """Set the display unit (:class:`UnitExponents` instance) of a quantity
+    directly and return the quantity.
+
+    Unlike the :attr:`~DimObject.display_unit` setter, this doesn't copy the
+    display unit, so it may be shared with the lambda unit.
+    """
+    quantity._display_unit = display_unit
+    if not lazy_simplification:
+        quantity._get_display_unit()
+    return quantity
+
+
+# Names of the slots of the classes of DimObject instances, by class (see
+# DimObject._copy)
+_SLOT_NAMES = {}
+
+# Kinds of entries in the index of units by dimension (see Units.by_dimension)
+_KINDS = (None, 'units', 'constants', 'prefixable')
+
+
 class Units(dict):
 
     """Dictionary of units with dynamic prefixing (upon access)
@@ -1346,14 +2508,162 @@ class Units(dict):
     - :attr:`coherent_relations` - List of coherent relations among the units
 
          Each entry is an :class:`UnitExponents` instance that evaluates to
-         unity.
+         unity.  The relations of the units loaded by :meth:`load_ini` are
+         added as the definitions are evaluated, when the relations are next
+         indexed.
+
+    - :attr:`simplification_cache` - :class:`~natu.util.LRUCache` of the
+      results of :meth:`simplify`
+
+         It is cleared when :attr:`coherent_relations` is extended by
+         :meth:`load_ini`.  Clear it if :attr:`coherent_relations` is otherwise
+         modified.
+
+    - :attr:`format_cache` - :class:`~natu.util.LRUCache` of the units and
+      unit strings used to format quantities, by display unit and format code
+
+         It is cleared by :meth:`load_ini` and when a unit is added, replaced,
+         or deleted.
+
+    - :attr:`preferred_units` - Dictionary of preferred display units
+      (:class:`UnitExponents` instances) by dimension (:class:`Dimension`
+      instances)
+
+         It is filled from *preferred_units* in :mod:`natu.config` when the
+         relations are indexed after :meth:`load_ini`.  Entries can be added
+         or replaced to change the display unit that :meth:`simplify` gives
+         for a dimension.
+
+    The definitions loaded by :meth:`load_ini` are evaluated upon access (see
+    :meth:`__getitem__`).  The coherent relations are indexed for
+    :meth:`simplify` upon the first simplification after :meth:`load_ini` and
+    again upon the first simplification after a definition with a relation is
+    evaluated.  Only the relations of the evaluated definitions are indexed,
+    along with those of the preferred display units, whose definitions are
+    evaluated when the relations are first indexed.  Therefore, a display unit
+    isn't rewritten in terms of a unit that hasn't been accessed unless it is
+    preferred.  Iterating over the symbols (e.g., :meth:`keys`) doesn't
+    evaluate the definitions, but :meth:`values` and :meth:`items` do.
+
+    The dictionary can be shared among threads.  Reading a unit that has been
+    evaluated or a prefixed unit that has been cached, simplifying a unit that
+    is in :attr:`simplification_cache`, and looking up the indexes take no
+    lock.  Changes (adding, replacing, or deleting units and
+    :meth:`load_ini`), the evaluation of definitions, and the creation of
+    prefixed units and indexes are serialized by a reentrant lock, and a
+    reader that misses the lock-free path checks again under the lock.  The
+    indexes are built completely before they are published, and an index is
+    replaced instead of modified (copy-on-write), so a reader sees either the
+    previous or the next state but nothing in between.  The caches are safe for
+    concurrent use (see :class:`~natu.util.LRUCache`), and a result of
+    :meth:`simplify` or a compiled format is only cached if the relations or
+    units that it is based on are still current.  The dictionary itself isn't
+    copied on write; it is updated in place under the lock.  Each change is
+    atomic, but a sequence of reads (e.g., iterating over the units while
+    another thread adds one) may see some changes and not others.  Changing
+    :attr:`coherent_relations` or :attr:`preferred_units` directly isn't
+    synchronized; do it before the dictionary is shared.
+
+    **Example:**
+
+    >>> from threading import Thread
+    >>> from natu.config import definitions
+    >>> units = Units()
+    >>> units.load_ini(definitions)
+    >>> results = []
+    >>> def work():
+    ...     results.append((units['kJ'],
+    ...                     str(units.simplify(UnitExponents('kg*m2/s2')))))
+    >>> threads = [Thread(target=work) for i in range(8)]
+    >>> for thread in threads:
+    ...     thread.start()
+    >>> for thread in threads:
+    ...     thread.join()
+    >>> len(results)
+    8
+    >>> all(kJ == results[0][0] and unit == 'J' for kJ, unit in results)
+    True
     """
 
     def __init__(self, *args, **kwargs):
         dict.__init__(self, *args, **kwargs)
 
+        # Initialize the lock for changes and evaluations.
+        self._lock = RLock()
+
         # Initialize an empty list of coherent relations.
         self.coherent_relations = []
+        self._relation_index = None
+        self._partial_index = None  # Used while all definitions are evaluated
+
+        # Initialize the positions of the definitions, by symbol (to order the
+        # units by precedence in the relation index).
+        self._positions = {}
+
+        # Initialize the definitions that haven't been evaluated, by symbol.
+        # Each entry is a tuple of the position of the definition (in the order
+        # of loading) and the expression.
+        self._pending = OrderedDict()
+        self._n_definitions = 0
+        self._provided = _provided()
+        self._loading = False  # True while all the definitions are evaluated
+
+        # Initialize the snapshot to be saved once all of the definitions have
+        # been evaluated, as a tuple of the directory, name, and definitions
+        # (see load_ini).
+        self._pending_snapshot = None
+
+        # Initialize the coherent relations of the evaluated definitions that
+        # haven't been indexed, by position of definition.
+        self._new_relations = {}
+
+        # Initialize the cache of prefixed units.
+        self._prefixed = {}
+
+        # Initialize the index of the symbols by dimension (built upon first
+        # use).
+        self._dimension_index = None
+
+        # Initialize the cache of simplified units.
+        self.simplification_cache = LRUCache(simplification_cache_size)
+
+        # Initialize the table of preferred display units.
+        self.preferred_units = {}
+        self._preferred_added = True
+
+        # Initialize the cache of compiled unit formats and the number of
+        # times that the units have been replaced, deleted, or loaded (to
+        # check that a new format wasn't based on replaced units).
+        self.format_cache = LRUCache(format_cache_size)
+        self._revision = 0
+
+        # Initialize the name of the UnitsModule that holds the dictionary
+        # (None if there isn't one).
+        self._module = None
+
+    def __reduce__(self):
+        """Return a reference to the dictionary for pickling.
+
+        The display units of quantities are bound to the dictionary (see
+        :class:`UnitExponents`), so it is pickled by reference, not by value.
+        This is only possible if it is held by a :class:`UnitsModule` (e.g.,
+        :mod:`natu.units`), which is imported again when the dictionary is
+        unpickled.
+
+        **Example:**
+
+        >>> import pickle
+        >>> from natu.units import _units, m, s
+        >>> speed = pickle.loads(pickle.dumps(3*m/s))
+        >>> print(speed)
+        3 m/s
+        >>> speed.display_unit._units is _units
+        True
+        """
+        if self._module is None:
+            raise TypeError("Only the units of a UnitsModule (e.g., "
+                            "natu.units) can be pickled.")
+        return (_module_units, (self._module,))
 
     def __call__(self, **factors):
         r"""Generate a compound, coherent unit from existing units.
@@ -1380,19 +2690,146 @@ class Units(dict):
     def __getitem__(self, symbol):
         """Access a simple (not compound) unit by *symbol* (a string).
 
-        Prefixes are supported.
+        Prefixes are supported.  Each prefixed unit is created upon its first
+        access and then cached.  Each access returns a copy of the cached unit,
+        so setting the display unit of a prefixed unit doesn't affect the other
+        accesses.  The cache is cleared when a unit is added, replaced, or
+        deleted.
+
+        A unit or constant loaded by :meth:`load_ini` is evaluated upon its
+        first access, after the units that it depends on.
 
         **Example:**
 
         >>> from natu.units import _units
         >>> _units['psi']
         ScalarUnit(6894.76, 'M/(L*T2)', 'psi', False) (psi)
+        >>> kPa = _units['kPa']
+        >>> kPa == _units['kPa']
+        True
+        >>> kPa.display_unit = 'Pa'
+        >>> print(_units['kPa'].display_unit)
+        kPa
         """
         try:
             return dict.__getitem__(self, symbol)  # Constant or standard unit
         except KeyError:
-            pass  # Prefixed unit (below)
+            pass
+        try:
+            unit = self._prefixed[symbol]  # Prefixed unit
+        except KeyError:
+            with self._lock:
+                # Check again since another thread may have added the unit.
+                try:
+                    return dict.__getitem__(self, symbol)
+                except KeyError:
+                    pass
+                if symbol in self._pending:
+                    return self._load(symbol)  # Not evaluated yet
+                try:
+                    unit = self._prefixed[symbol]
+                except KeyError:
+                    unit = self._prefixed[symbol] = self._prefix(symbol)
+        return unit._copy() if isinstance(unit, DimObject) else unit
+
+    def __setitem__(self, symbol, unit):
+        """Add or replace a unit (or constant) by *symbol* (a string).
+        """
+        with self._lock:
+            self._pending.pop(symbol, None)
+            self._pending_snapshot = None  # No longer matches the files
+            if self._dimension_index is not None:
+                self._unindex(symbol)
+                self._index(self._dimension_index, symbol, unit)
+            dict.__setitem__(self, symbol, unit)
+            self._prefixed.clear()
+            self._clear_formats()
+
+    def __delitem__(self, symbol):
+        """Delete a unit (or constant) by *symbol* (a string).
+        """
+        with self._lock:
+            self._pending_snapshot = None  # No longer matches the files
+            try:
+                del self._pending[symbol]
+            except KeyError:
+                if self._dimension_index is not None:
+                    self._unindex(symbol)
+                dict.__delitem__(self, symbol)
+            self._prefixed.clear()
+            self._clear_formats()
+
+    def _clear_formats(self):
+        """Clear :attr:`format_cache` since the units that the formats are
+        based on have changed.
+
+        The caller must hold the lock.
+        """
+        self._revision += 1
+        self.format_cache.clear()
+
+    def __contains__(self, symbol):
+        """Return *True* if a unit (or constant) is defined by *symbol* (a
+        string), whether or not it has been evaluated.
+
+        Prefixed units aren't included.
+        """
+        if dict.__contains__(self, symbol):
+            return True
+        with self._lock:
+            return dict.__contains__(self, symbol) or symbol in self._pending
+
+    def __iter__(self):
+        """Iterate over the symbols of the units (and constants) without
+        evaluating them.
+        """
+        with self._lock:
+            return iter(list(dict.__iter__(self)) + list(self._pending))
+
+    def __len__(self):
+        """Return the number of units (and constants)."""
+        with self._lock:
+            return dict.__len__(self) + len(self._pending)
+
+    def keys(self):
+        """Return a list of the symbols of the units (and constants).
+        """
+        return list(self)
+
+    def values(self):
+        """Return a list of the units (and constants), evaluating them if
+        necessary.
+        """
+        with self._lock:
+            self._load_all()
+            return list(dict.values(self))
+
+    def items(self):
+        """Return a list of tuples of the symbols and the units (and
+        constants), evaluating them if necessary.
+        """
+        with self._lock:
+            self._load_all()
+            return list(dict.items(self))
+
+    def get(self, symbol, default=None):
+        """Return the unit (or constant) defined by *symbol* (a string) or
+        *default* if there isn't one.
+
+        Prefixes aren't supported.
+        """
+        try:
+            return dict.__getitem__(self, symbol)
+        except KeyError:
+            pass
+        with self._lock:
+            if symbol in self._pending:
+                return self._load(symbol)
+            return dict.get(self, symbol, default)
 
+    def _prefix(self, symbol):
+        """Create a prefixed unit from its symbol (a string).
+        """
         # Default error:
         error = KeyError(symbol + " isn't a valid unit.")
 
@@ -1402,6 +2839,8 @@ class Units(dict):
             # Get the base unit.
             try:
                 basesymbol = symbol[len_prefix:]
+                if basesymbol in self._pending:
+                    self._load(basesymbol)
                 baseunit = dict.__getitem__(self, basesymbol)
             except IndexError:
                 # The unit isn't longer than the length of the prefix.
@@ -1426,19 +2865,46 @@ class Units(dict):
             else:
                 if isinstance(baseunit, ScalarUnit):
                     return ScalarUnit(p * baseunit._value,
-                                      baseunit.dimension, symbol)
+                                      baseunit._dimension, symbol)
                 if isinstance(baseunit, LambdaUnit):
+                    if baseunit._transform is not None:
+                        scale, offset, base = baseunit._transform
+                        return LambdaUnit._fromtransform(
+                            (p * scale, offset, base), baseunit._dimension,
+                            symbol)
                     return LambdaUnit(lambda n: baseunit._toquantity(p * n),
                                       lambda q: baseunit._tonumber(q) / p,
-                                      baseunit.dimension, symbol)
+                                      baseunit._dimension, symbol)
                 return p * baseunit # Scalar unit, but not using quantities
 
         raise error
 
-    def load_ini(self, files):
+    def load_ini(self, files, snapshot_dir=None):
         r"""Add units to the unit dictionary from a \*.ini file or list of files
         (*files*).
 
+        The definitions are recorded and each is evaluated upon its first
+        access (see :meth:`__getitem__`).  If *lazy_simplification* is *False*
+        in :mod:`natu.config`, then all of the definitions are evaluated
+        immediately since the coherent relations are needed to simplify the
+        display units as they are created.  A definition that refers to a unit
+        that is redefined later uses the later definition.
+
+        The display units of the loaded units are bound to this dictionary, so
+        the quantities derived from them are simplified and formatted using its
+        units and coherent relations, even if it isn't the global dictionary
+        of :mod:`natu.units` (see :class:`UnitExponents`).
+
+        If *snapshot_dir* is given and the dictionary is empty, then the units
+        are restored from a snapshot in that directory if one was saved from
+        the same files with the same settings.  Otherwise, the definitions are
+        recorded as usual and a snapshot is saved once all of them have been
+        evaluated (e.g., by :meth:`values`), unless the dictionary has been
+        modified by then (see :mod:`natu._snapshot`).  The snapshot includes
+        the index of the coherent relations, so it isn't rebuilt after a
+        restore.  The lambda units can't be saved, so their definitions are
+        evaluated again upon access.
+
         **Examples:**
 
         .. code-block:: python
@@ -1455,103 +2921,324 @@ class Units(dict):
 
            >>> sorted(units.keys())
            ['R', 'R_K', 'R_inf', 'c', 'k_Aprime', 'k_F', 'k_J', 'rational']
-        """
-        # pylint: disable=I0011, R0912, R0914
 
-        # Temporarily add some constants, functions, and classes to the unit
-        # space for use in the *.ini files.
-        from fractions import Fraction
-        sqrt = lambda x: x**Fraction(0.5)
-        # (Not using natu.math.sqrt to avoid cyclic import.)
-        provided = dict(pi=math.pi, exp=math.exp, log=math.log,
-                        log10=math.log10, sqrt=sqrt,
-                        Quantity=Quantity, ScalarUnit=ScalarUnit)
-        self.update(provided)
+        Using units with other base constants alongside :mod:`natu.units`:
+
+        >>> from os import path
+        >>> from natu.units import J
+        >>> dname = path.dirname(definitions[0])
+        >>> planck = Units()
+        >>> planck.load_ini([path.join(dname, fname) for fname in
+        ...                  ['base-Planck.ini', 'derived.ini', 'BIPM.ini',
+        ...                   'other.ini']])
+        >>> print(3*J)
+        3 J
+        >>> print(3*planck['J'])
+        3 J
+        >>> planck['J'].dimension == J.dimension
+        False
+        >>> J*planck['J'] # doctest: +ELLIPSIS
+        Traceback (most recent call last):
+        ...
+        AssertionError: The quantities must be derived from the same units ...
+
+        Using a snapshot:
+
+        >>> from tempfile import mkdtemp
+        >>> dname = mkdtemp()
+        >>> saved = Units()
+        >>> saved.load_ini([definitions[0]], dname)
+        >>> len(saved.values()) # Evaluates all and saves the snapshot
+        8
+        >>> restored = Units()
+        >>> restored.load_ini([definitions[0]], dname) # Loads the snapshot
+        >>> restored['c'] == units['c']
+        True
+        >>> restored._relation_index is not None # Restored, not rebuilt
+        True
+
+        .. testcleanup::
 
-        # Load the units from the *.ini files.
+           >>> from shutil import rmtree
+           >>> rmtree(dname)
+        """
+        with self._lock:
+            # Restore the units from a snapshot if there is one for the files.
+            name = None
+            self._pending_snapshot = None
+            if snapshot_dir and not self:
+                name = _snapshot.key(files, use_quantities)
+                if name:
+                    state = _snapshot.load(snapshot_dir, name, self)
+                    if state is not None:
+                        self._restore(state)
+                        return
+
+            # Load the definitions from the *.ini files.
+            try:
+                config = RawConfigParser(interpolation=None,
+                                         inline_comment_prefixes=[';'])
+            except TypeError:
+                config = RawConfigParser()
+            config.optionxform = str  # Units are case sensitive.
+            if len(config.read(files)) != len(files):
+                raise DefinitionError(
+                    "Failed to open/find all definition files")
+            definitions = {}
+            for section in config.sections():
+                for symbol, value in config.items(section):
+                    # print(symbol)
+                    if symbol in self:
+                        msg = ('In section "%s", overriding previous value of '
+                               '%s' % (section, symbol))
+                        # warn(msg)
+                        print(msg)
+                    definitions[symbol] = value
+                    self._define(symbol, value)
+
+            # Save a snapshot once the definitions have been evaluated.
+            if name:
+                self._pending_snapshot = (snapshot_dir, name, definitions)
+            self._finish_loading()
+
+    def _evaluate(self, symbol, value):
+        r"""Evaluate the definition (*value*, a string) of a unit or constant
+        (*symbol*) from a \*.ini file.
+
+        **Returns:** A tuple of the unit (or constant) and the coherent
+        relation that it defines (or *None*)
+        """
+        # pylint: disable=I0011, R0912
+        relation = None
         try:
-            config = RawConfigParser(interpolation=None,
-                                     inline_comment_prefixes=[';'])
-        except TypeError:
-            config = RawConfigParser()
-        config.optionxform = str  # Units are case sensitive.
-        if len(config.read(files)) != len(files):
-            raise DefinitionError("Failed to open/find all definition files")
-        for section in config.sections():
-            for symbol, value in config.items(section):
-                # print(symbol)
-                if symbol in self:
-                    msg = ('In section "%s", overriding previous value of %s'
-                           % (section, symbol))
-                    # warn(msg)
-                    print(msg)
-                try:
-                    unit = eval(value, self, self)
-                    # self is provided as the global namespace as well as the
-                    # local one so that it's immediately used by the lambda
-                    # functions.  This doesn't allow prefixes in the lambda
-                    # expressions since eval() doesn't use __getitem__() for
-                    # globals.
-                    # TODO: Consider pyparsing instead of eval() (for safety)
-                    # if it's not too slow.
-                    if isinstance(unit, tuple):
-                        unit, prefixable = unit
-                        if isinstance(unit, tuple):
-                            # The unit is a lambda unit, defined via a tuple.
-                            toquantity, tonumber = unit
-                            try:
-                                # Evaluate the unit with an arbitrary number
-                                # (zero) to determine the dimension.
-                                dim = toquantity(0).dimension
-                            except AttributeError:
-                                # The result doesn't have a dimension; the unit
-                                # must be dimensionless.
-                                dim = {}
-                            unit = LambdaUnit(toquantity, tonumber, dim, symbol,
-                                              prefixable)
-                        elif isinstance(unit, LambdaUnit):
-                            # The unit is a lambda unit, defined directly.
-                            unit = LambdaUnit(unit._toquantity, unit._tonumber,
-                                              unit._dimension,
-                                              unit._display_unit, prefixable)
-                        elif isinstance(unit, Quantity):
-                            # The unit is a scalar unit with dimension.
-                            if (isinstance(unit, ScalarUnit)
-                                and 'ScalarUnit' not in value):
-                                # The unit has been coherently derived.
-                                relation = unit.display_unit - {symbol: 1}
-                                self.coherent_relations.append(relation)
-                            unit = ScalarUnit.from_quantity(unit, symbol,
-                                                           prefixable)
-                        else:
-                            # The unit is a dimensionless scalar unit.
-                            unit = ScalarUnit(unit, {}, symbol, prefixable)
-                except (AssertionError, AttributeError, ConfigParserError,
-                        NameError, SyntaxError, TypeError, ValueError) as e:
-                    raise DefinitionError("can't load '%s' due to %s"
-                                          % (symbol, type(e).__name__))
-                if isinstance(unit, Quantity) and not use_quantities:
-                    # Represent quantities as pure numbers (don't track the
-                    # dimension and display unit).
-                    unit = unit._value
-                self[symbol] = unit
-
-        # Remove the temporary items.
-        for key in provided.keys():
-            del self[key]
-        # __builtins__ got added because self is the global argument to eval()
-        # above.
-        self.pop('__builtins__', None)
-
-    def simplify(self, unit, level=simplification_level):
+            expression = compile_expression(value)
+
+            # Evaluate the units that the definition depends on.
+            for name in expression.names:
+                if name in self._pending:
+                    self._load(name)
+
+            unit = expression(self._lookup)
+            if isinstance(unit, tuple):
+                unit, prefixable = unit
+                if isinstance(unit, tuple):
+                    # The unit is a lambda unit, defined via a tuple.
+                    toquantity, tonumber = unit
+                    try:
+                        # Evaluate the unit with an arbitrary number (zero) to
+                        # determine the dimension.
+                        dim = toquantity(0).dimension
+                    except AttributeError:
+                        # The result doesn't have a dimension; the unit must be
+                        # dimensionless.
+                        dim = {}
+                    unit = LambdaUnit(toquantity, tonumber, dim, symbol,
+                                      prefixable)
+                elif isinstance(unit, LambdaUnit):
+                    # The unit is a lambda unit, defined directly.  If it was
+                    # declared via affine() or logarithmic(), it doesn't have a
+                    # display unit yet, so it takes the symbol.
+                    if unit._transform is None:
+                        unit = LambdaUnit(unit._toquantity, unit._tonumber,
+                                          unit._dimension, unit._display_unit,
+                                          prefixable)
+                    else:
+                        unit = LambdaUnit._fromtransform(
+                            unit._transform, unit._dimension,
+                            unit._display_unit or symbol, prefixable)
+                elif isinstance(unit, Quantity):
+                    # The unit is a scalar unit with dimension.
+                    if (isinstance(unit, ScalarUnit)
+                        and 'ScalarUnit' not in value):
+                        # The unit has been coherently derived.
+                        relation = unit._display_unit - {symbol: 1}
+                    unit = ScalarUnit.from_quantity(unit, symbol, prefixable)
+                else:
+                    # The unit is a dimensionless scalar unit.
+                    unit = ScalarUnit(unit, {}, symbol, prefixable)
+        except (AssertionError, AttributeError, ConfigParserError, NameError,
+                SyntaxError, TypeError, ValueError) as e:
+            raise DefinitionError("can't load '%s' due to %s"
+                                  % (symbol, type(e).__name__))
+        if isinstance(unit, Quantity) and not use_quantities:
+            # Represent quantities as pure numbers (don't track the dimension
+            # and display unit).
+            unit = unit._value
+        self._bind(unit)
+        return unit, relation
+
+    def _bind(self, unit):
+        """Bind the display unit of a unit or constant to this dictionary (see
+        :class:`UnitExponents`).
+        """
+        try:
+            display_unit = unit._display_unit
+        except AttributeError:
+            return  # Not a DimObject
+        if display_unit._units is not self:
+            display_unit = display_unit.copy()
+            display_unit._units = self
+            unit._display_unit = display_unit
+
+    def _lookup(self, name):
+        r"""Return the value of a name in a definition from a \*.ini file.
+
+        The name may be a unit (possibly prefixed) or constant or one of the
+        constants, functions, and classes provided for the \*.ini files.
+        """
+        value = dict.get(self, name)
+        if value is not None:
+            return value
+        if name in self._provided:
+            return self._provided[name]
+        try:
+            return self[name]
+        except KeyError:
+            raise NameError("name '%s' is not defined" % name)
+
+    def _define(self, symbol, value):
+        """Record the definition (*value*, a string) of a unit or constant
+        (*symbol*) to be evaluated upon access.
+        """
+        dict.pop(self, symbol, None)
+        self._pending.pop(symbol, None)
+        self._pending[symbol] = (self._n_definitions, value)
+        self._positions[symbol] = self._n_definitions
+        self._n_definitions += 1
+
+    def _load(self, symbol):
+        """Evaluate the pending definition of a unit or constant (*symbol*),
+        add it to the dictionary, and return it.
+
+        The caller must hold the lock.
+        """
+        position, value = self._pending.pop(symbol)
+        unit, relation = self._evaluate(symbol, value)
+        dict.__setitem__(self, symbol, unit)
+        if relation is not None:
+            self._new_relations[position] = relation
+            if not self._loading:
+                # Re-index the coherent relations upon the next
+                # simplification.
+                self.simplification_cache.clear()
+                self._relation_index = None
+        return unit
+
+    def _load_all(self):
+        """Evaluate all of the pending definitions.
+        """
+        with self._lock:
+            if not self._pending:
+                self._save_snapshot()
+                return
+            self._loading = True
+            try:
+                while self._pending:
+                    self._load(next(iter(self._pending)))
+            finally:
+                self._loading = False
+                self._partial_index = None
+
+            # Re-index the coherent relations upon the next simplification.
+            # If the display units of the constants have already been
+            # simplified, it was with the relations known at the time, so
+            # simplify them again.
+            self.simplification_cache.clear()
+            self._relation_index = None
+            if not lazy_simplification:
+                for unit in dict.values(self):
+                    if isinstance(unit, Quantity) and not isinstance(unit,
+                                                                     Unit):
+                        unit.display_unit = unit._display_unit
+            self._save_snapshot()
+
+    def _save_snapshot(self):
+        """Save the snapshot recorded by :meth:`load_ini`, if any.
+
+        All of the definitions must have been evaluated.  Lambda units are
+        recorded by their definitions.  The relation index is built if
+        necessary and saved too.  The caller must hold the lock.
+        """
+        if self._pending_snapshot is None:
+            return
+        dname, name, definitions = self._pending_snapshot
+        self._pending_snapshot = None
+        index = self._get_relation_index()
+        units = [(symbol, None if isinstance(unit, LambdaUnit) else unit)
+                 for symbol, unit in dict.items(self)]
+        _snapshot.save(dname, name, dict(
+            units=units, definitions=definitions,
+            coherent_relations=self.coherent_relations,
+            relation_index=index), self)
+
+    def _add_relations(self):
+        """Add the coherent relations of the evaluated definitions to
+        :attr:`coherent_relations` in the order of definition.
+        """
+        self.coherent_relations.extend(relation for _, relation
+                                       in sorted(self._new_relations.items()))
+        self._new_relations.clear()
+
+    def _restore(self, state):
+        """Restore the units from the state saved in a snapshot by
+        :meth:`load_ini`.
+        """
+        definitions = state['definitions']
+        for symbol, unit in state['units']:
+            if unit is None:
+                self._define(symbol, definitions[symbol])  # Lambda unit
+            else:
+                self._bind(unit)
+                dict.__setitem__(self, symbol, unit)
+        self._positions.update((symbol, position) for position, symbol
+                               in enumerate(definitions))
+        self.coherent_relations.extend(state['coherent_relations'])
+        self._finish_loading()
+
+        # Use the saved index of the relations.  The preferred display units
+        # aren't saved since they may have been changed before the snapshot.
+        self._add_preferred_units()
+        self._relation_index = state['relation_index']
+
+    def _finish_loading(self):
+        """Update the caches and tables after units have been loaded.
+        """
+        self._prefixed.clear()
+        self._dimension_index = None
+
+        # Recompile the unit formats upon the next use.
+        self._clear_formats()
+
+        # Re-index the coherent relations upon the next simplification and add
+        # the preferred display units then.
+        self.simplification_cache.clear()
+        self._relation_index = None
+        self._preferred_added = False
+
+        if not lazy_simplification:
+            self._load_all()
+
+    def simplify(self, unit, level=simplification_level, dimension=None):
         r"""Simplify a compound unit.
 
-        This function seeks to minimize the sum of the absolute values of the
-        exponents of the base factors by substituting coherently related units.
-        It uses the internal :attr:`coherent_relations` list which is generated
-        while parsing the \*.ini files (in :meth:`load_ini`).  It will not
-        always find the simplest representation because some simplifications
-        involve first making the representation more complex.
+        This function minimizes the sum of the absolute values of the exponents
+        of the base factors by substituting coherently related units.  It uses
+        the internal :attr:`coherent_relations` list which is generated while
+        parsing the \*.ini files (in :meth:`load_ini`).  The relations are
+        reduced once, and the units that span the same independent units are
+        indexed together upon first use, so the search takes about the same
+        time regardless of the unit.  Only the units whose expansions lie
+        within those of the original's units are substituted (e.g., m3 isn't
+        rewritten as J/Pa), and a representation is only used if it is less
+        complex and has fewer distinct units than the original; otherwise, the
+        original is kept.  The candidates of up to four factors among the
+        related units are searched (units that aren't in any relation and
+        non-integer exponents are kept as is), and larger ones are built
+        greedily (see :meth:`natu._simplification.RelationIndex.simplest`).
+
+        If *dimension* is given and :attr:`preferred_units` has an equivalent
+        unit for it, then that unit is used without a search.  Otherwise, the
+        results are cached in :attr:`simplification_cache`.
 
         **Parameters:**
 
@@ -1560,11 +3247,13 @@ class Units(dict):
              This can be an :class:`UnitExponents` instance or a :class:`dict`
              of similar form.
 
-        - *level*: Number of levels of recursion to perform
+        - *level*: 0 to skip the simplification
 
-             This is the number of non-minimizing substitutions that can be made
-             while seeking the simplest representation of the unit.  The default
-             is
+             The default is *simplification_level* from :mod:`natu.config`.
+             Other values have the same effect.
+
+        - *dimension*: Physical dimension of the unit as a :class:`Dimension`
+          instance, if known
 
         **Returns:**  The new representation of the unit as an instance of the
         same class as the original representation (*unit*).
@@ -1580,47 +3269,227 @@ class Units(dict):
         >>> from natu.units import _units
         >>> print(_units.simplify('kg*m2/s2'))
         J
-        """
-        # pylint: disable=I0011, E1103
 
-        # Objective to minimize
-        complexity = lambda x: sum(map(abs, x.values()))
-        # This is the L1 norm (sum of the absolute values of the exponents),
-        # making this problem L1 minimization.  There isn't a simple solution,
-        # and there isn't a simple Python package to find it without a lot of
-        # dependencies (as of 6/29/14).  The closest packages are scipy.linalg,
-        # L1L2Py, and pyl1min (http://sourceforge.net/projects/pyl1min/).  The
-        # approach below is more or less brute force.  It isn't guaranteed to
-        # find the best solution, but it's straightforward to implement and
-        # works well enough.
+        A unit is only replaced by one with fewer distinct units:
+
+        >>> from natu.core import Dimension, UnitExponents
+        >>> print(_units.simplify(UnitExponents('m3')))
+        m3
+        >>> print(_units.simplify(UnitExponents('kg/m3')))
+        kg/m3
+        >>> print(_units.simplify(UnitExponents('kg/s2')))
+        kg/s2
+
+        Preferring newton metres to joules for energy:
+
+        >>> energy = Dimension('L2*M/T2')
+        >>> _units.preferred_units[energy] = UnitExponents('N*m')
+        >>> print(_units.simplify(UnitExponents('kg*m2/s2'), dimension=energy))
+        N*m
 
+        .. testcleanup::
+           >>> _units.preferred_units[energy] = UnitExponents('J')
+        """
         # Shortcut---no simplication:
-        if level == 0 or complexity(unit) <= 1:
+        if level == 0 or _complexity(unit) <= 1:
             return unit
 
-        # Loop to try each of the coherent relations.
-        simpler = True
-        while simpler:
-            simpler = False
-            for identity in self.coherent_relations:
-                common = set(identity).intersection(unit)
-                if len(common) < len(identity) / 2 - 0.5:
-                    # Skip for speed; the relation isn't worth it.
-                    continue
-                for factor in common:
-                    try:
-                        factor = float(unit[factor]) / identity[factor]
-                    except KeyError:
-                        return unit # A factor has not yet been defined.
-                    int_factor = int(factor)
-                    if int_factor == factor:
-                        temp = unit - identity * int_factor
-                        if level > 1:
-                            temp = self.simplify(temp, level - 1) # Recursion
-                        if complexity(temp) < complexity(unit):
-                            unit = temp
-                            simpler = True
-                            break
+        # Use the preferred unit for the dimension if it is equivalent.
+        index = self._get_relation_index()
+        if dimension is not None:
+            try:
+                preferred = self.preferred_units[dimension]
+            except KeyError:
+                pass
+            else:
+                expansion = index.expansion(unit)
+                if (expansion is not None
+                        and expansion == index.expansion(preferred)):
+                    return unit.__class__(preferred)
+
+        # Look up the result of a previous simplification.
+        key = frozenset(unit.items())
+        try:
+            return self.simplification_cache[key].copy()
+        except KeyError:
+            pass
+
+        simplified = self._simplify(unit, index)
+        with self._lock:
+            # Only cache the result if the index is still the published one.
+            # Otherwise, the result may be based on some of the relations
+            # (while the definitions are evaluated), or the relations may have
+            # changed and the cache may have been cleared since the search.
+            if index is self._relation_index:
+                self.simplification_cache[key] = simplified.copy()
+        return simplified
+
+    def _get_relation_index(self):
+        """Return the index of the coherent relations, building it if
+        necessary.
+        """
+        index = self._relation_index
+        if index is not None:
+            return index
+        with self._lock:
+            if self._loading:
+                # Index the relations known so far for the evaluation of the
+                # definitions.  The index is rebuilt once all of the
+                # definitions have been evaluated.
+                if self._partial_index is None:
+                    self._partial_index = RelationIndex(
+                        self.coherent_relations +
+                        [relation for _, relation
+                         in sorted(self._new_relations.items())],
+                        key=self._precedence)
+                return self._partial_index
+            index = self._relation_index
+            if index is None:
+                # Add the preferred display units that are available.  This
+                # evaluates their definitions, so their relations are indexed.
+                self._add_preferred_units()
+
+                # Index the relations of the definitions that have been
+                # evaluated.  The units take precedence in the order of
+                # definition, regardless of the order of evaluation.
+                self._add_relations()
+                index = RelationIndex(self.coherent_relations,
+                                      key=self._precedence)
+
+                # Publish the index.
+                self._relation_index = index
+            return index
+
+    def _add_preferred_units(self):
+        """Add the preferred display units from :mod:`natu.config` that are
+        available to :attr:`preferred_units` if they haven't been added since
+        the last :meth:`load_ini`.
+
+        The caller must hold the lock.
+        """
+        if not self._preferred_added:
+            for symbol in preferred_units:
+                unit = self.get(symbol)
+                if isinstance(unit, Unit):
+                    self.preferred_units.setdefault(
+                        unit._dimension, UnitExponents({symbol: 1}))
+            self._preferred_added = True
+
+    def _precedence(self, symbol):
+        """Return the position of the definition of a unit (*symbol*) or the
+        number of definitions if it wasn't loaded by :meth:`load_ini`.
+        """
+        positions = self._positions
+        return positions.get(symbol, len(positions))
+
+    def by_dimension(self, dimension, kind=None):
+        """Return a dictionary of the units and constants with a dimension.
+
+        **Parameters:**
+
+        - *dimension*: The dimension (a :class:`Dimension`,
+          :class:`~natu.exponents.Exponents`, or :class:`dict` instance or a
+          string) or a quantity or unit with the dimension
+
+        - *kind*: *None* for all of the units and constants, 'units' for only
+          the units, 'constants' for only the constants (quantities that aren't
+          units), or 'prefixable' for only the prefixable units
+
+        The units and constants are looked up in an index by dimension, which
+        is built upon the first call (evaluating the definitions loaded by
+        :meth:`load_ini`).  The index is updated as units are added, replaced,
+        or deleted.  Prefixed units aren't included.
+
+        **Example:**
+
+        >>> from natu.units import _units, m, s
+        >>> sorted(_units.by_dimension('L/T', 'constants'))
+        ['c']
+        >>> sorted(_units.by_dimension(m/s, 'units'))
+        ['kn', 'kph', 'mph']
+        """
+        try:
+            dimension = dimension._dimension
+        except AttributeError:
+            dimension = Dimension(dimension)
+        try:
+            return dict(self._get_dimension_index()[dimension][kind])
+        except KeyError:
+            if kind in _KINDS:
+                return {}
+            raise ValueError("kind must be None, 'units', 'constants', or "
+                             "'prefixable'.")
+
+    def _get_dimension_index(self):
+        """Return the index of the units (and constants) by dimension, building
+        it if necessary.
+
+        The index is a dictionary of dictionaries by dimension
+        (:class:`Dimension` instance) and kind (see :meth:`by_dimension`).
+        Each entry is a dictionary of units (and constants) by symbol.
+        """
+        index = self._dimension_index
+        if index is not None:
+            return index
+        with self._lock:
+            index = self._dimension_index
+            if index is None:
+                index = {}
+                for symbol, unit in self.items():
+                    self._index(index, symbol, unit)
+                self._dimension_index = index  # Publish the index.
+            return index
+
+    @staticmethod
+    def _index(index, symbol, unit):
+        """Add a unit (or constant) to an index by dimension (*index*).
+
+        The entry for the dimension is replaced, not modified.
+        """
+        if not isinstance(unit, DimObject):
+            return
+        try:
+            kinds = {kind: dict(units) for kind, units
+                     in index[unit._dimension].items()}
+        except KeyError:
+            kinds = {kind: {} for kind in _KINDS}
+        kinds[None][symbol] = unit
+        if isinstance(unit, Unit):
+            kinds['units'][symbol] = unit
+            if unit._prefixable:
+                kinds['prefixable'][symbol] = unit
+        else:
+            kinds['constants'][symbol] = unit
+        index[unit._dimension] = kinds
+
+    def _unindex(self, symbol):
+        """Remove a unit (or constant) from the index by dimension.
+
+        The entry for the dimension is replaced, not modified.
+        """
+        unit = dict.get(self, symbol)
+        if isinstance(unit, DimObject):
+            index = self._dimension_index
+            index[unit._dimension] = {
+                kind: {other: value for other, value in units.items()
+                       if other != symbol}
+                for kind, units in index[unit._dimension].items()}
+
+    def _simplify(self, unit, index):
+        """Simplify a compound unit using a relation index (*index*) without
+        using the cache.
+
+        See :meth:`simplify`.
+        """
+        # Separate the factors that can be substituted.
+        related = {base: exp for base, exp in unit.items() if base in index}
+        simplified = index.simplest(related)
+        if simplified is None:
+            return unit
+        unit = unit.copy()
+        for base in related:
+            del unit[base]
+        unit.update(simplified)
         return unit
 
 
@@ -1641,9 +3510,13 @@ class UnitsModule(ModuleType):
          they should be available via wildcard import (e.g.,
          ``from units_module import *``).
 
-    Only one :class:`UnitsModule` can be instantiated directly from \*.ini files
-    per Python_ session.  This prevents conflicts that could arise if the units
-    were reloaded with different base constants.
+    The first :class:`UnitsModule` that is instantiated from \*.ini files
+    (i.e., :mod:`natu.units`) holds the global :class:`Units` dictionary, which
+    is used for quantities that aren't derived from loaded units.  Others hold
+    independent dictionaries, so units with different base constants can be
+    used in the same Python_ session.  Each quantity is simplified and
+    formatted using the dictionary of the units that it is derived from (see
+    :class:`UnitExponents`).
     """
 
     def __init__(self, module, definitions):
@@ -1669,21 +3542,25 @@ class UnitsModule(ModuleType):
         if isinstance(definitions, dict):
             # Create a unit dictionary from the provided dictionary.
             self._units = Units(definitions)
+            self._units._module = self.__name__
         else:
             # Create an empty unit dictionary.
             self._units = Units()
+            self._units._module = self.__name__
 
-            # Allow only one unit dictionary.
-            assert not unitspace, "The units module can only be loaded once."
-            unitspace = self._units
+            # The first unit dictionary is the global one.
+            is_global = unitspace is None
+            if is_global:
+                unitspace = self._units
 
             # Load units from the ini files.
             self._use_quantities = use_quantities # Save in case changed later.
             try:
-                self._units.load_ini(definitions)
+                self._units.load_ini(definitions, snapshot_dir)
             except (DefinitionError, ParsingError):
                 # Allow the user to fix the INI files and try to import again.
-                unitspace = None
+                if is_global:
+                    unitspace = None
                 raise
 
         self.__all__ = list(self._units)
@@ -16,7 +16,7 @@ import re
 from collections import Counter
 from fractions import Fraction
 from . import config
-from .util import get_group, num2super
+from .util import LRUCache, num2super
 
 # Default keyword arguments sent to format()
 _DEFAULT_FORMAT = dict(
@@ -169,31 +169,73 @@ fl2 = i + r'(?:\.' + u + ')?(?:[Ee]' + i + ')'  # Float due to exponential
 fl = '(?:%s)|(?:%s)' % (fl1, fl2)  # Float
 fr = i + '/' + u  # Fraction
 
-# Regular expression parser for a base and an exponent:
+# Regular expression for the tokens of an expression: a base with an optional
+# exponent, unity, a parenthesis, or an operator
 base = '([A-Za-z][A-Za-z_]*)'
 exponent = r'(?:(?:\(({fr})\))|({fl})|({i}))'.format(fr=fr, fl=fl, i=i)
-remainder = '(.*)'
-parser = re.compile('%s%s?%s?' % (base, exponent, remainder))
-del fl1, fl2, fl, fr, base, exponent, remainder
+tokenizer = re.compile(r'%s%s?|(1)|(\()|(\))|([*/])' % (base, exponent))
+del fl1, fl2, fl, fr, base, exponent
 
+# Results of _parse(), keyed by expression
+_parsed = LRUCache(config.parse_cache_size)
 
-def _split(factor):
-    """Split a factor into a base, an exponent, and a remainder.
+
+def _parse(expr):
+    """Parse a string expression (see :meth:`Exponents.fromstr`) in a single
+    pass.
+
+    Return a tuple of (base, exponent) pairs.  The results are cached.
     """
-    # Parse the factor.
-    base, exp_fr, exp_fl, exp_i, remainder = parser.match(factor).groups()
-
-    # Cast the exponent into the appropriate number type.
-    if exp_fr is not None:
-        exp = Fraction(exp_fr)
-    elif exp_fl is not None:
-        exp = float(exp_fl)
-    elif exp_i is not None:
-        exp = int(exp_i)
-    else:
-        exp = 1
+    try:
+        return _parsed[expr]
+    except KeyError:
+        pass
+
+    factors = {}
+    group_signs = [1] # Sign of each open group, outermost first
+    sign = 1 # Sign of the next operand
+    operand = True # True if an operand is expected next
+    pos = 0
+    length = len(expr)
+    while pos < length:
+        match = tokenizer.match(expr, pos)
+        assert match, "Invalid expression at '%s'." % expr[pos:]
+        (base, exp_fr, exp_fl, exp_i, unity, opening, closing,
+         operator) = match.groups()
+        pos = match.end()
+        if operand:
+            if base is not None:
+                # Cast the exponent into the appropriate number type.
+                if exp_fr is not None:
+                    exp = Fraction(exp_fr)
+                elif exp_fl is not None:
+                    exp = float(exp_fl)
+                elif exp_i is not None:
+                    exp = int(exp_i)
+                else:
+                    exp = 1
+                factors[base] = factors.get(base, 0) + sign*exp
+                operand = False
+            elif unity is not None:
+                operand = False
+            else:
+                assert opening is not None, (
+                    "Invalid expression at '%s'." % match.group())
+                group_signs.append(sign)
+        elif operator is not None:
+            sign = group_signs[-1] if operator == '*' else -group_signs[-1]
+            operand = True
+        else:
+            assert closing is not None and len(group_signs) > 1, (
+                "The operation must be '*' or '/'.")
+            group_signs.pop()
+    assert not operand or not expr, (
+        "The expression can't end with an operator.")
+    assert len(group_signs) == 1, "The parentheses are unbalanced."
 
-    return base, exp, remainder
+    result = tuple((base, exp) for base, exp in factors.items() if exp)
+    _parsed[expr] = result
+    return result
 
 
 class Exponents(Counter):
@@ -384,7 +426,7 @@ class Exponents(Counter):
             if len(args) > 1:
                 raise TypeError("update expected at most 1 arguments, got %i"
                                 % len(args))
-            Counter.update(self, Exponents.fromstr(arg), **kwargs)
+            Counter.update(self, dict(_parse(arg)), **kwargs)
 
     @classmethod
     def fromstr(cls, expr):
@@ -399,6 +441,10 @@ class Exponents(Counter):
              as a fraction (with '/') enclosed in parentheses.  Factors may be
              multiplied('*'), divided ('/'), or grouped ('(...)').
 
+        The expression is tokenized in a single pass, and the parsed factors
+        are cached by expression (see *parse_cache_size* in
+        :mod:`natu.config`), so a repeated expression isn't parsed again.
+
         **Example:**
 
         >>> e = Exponents.fromstr('a/b/(c*d2)')
@@ -408,50 +454,7 @@ class Exponents(Counter):
         # Note: It's not possible to use the ast module (at least not easily)
         # because a valid expression is not necessarily valid Python.  pyparser
         # is an option, but it's much slower than re.
-
-        def process_expression(expr, exponents, add=True):
-            """Process a factor from the left of a string expression (expr).
-
-            Add the factor to exponents if add == True.  Otherwise, subtract it.
-            Return the remainder of the expression.
-            """
-            # Pass if the expression is unity.
-            if expr[0] == '1':
-                return expr.strip('1')
-
-            # Find the base, exponent, and remainder of the expression.
-            base, exp, remainder = _split(expr)
-
-            # Update the exponents.
-            if add:
-                exponents[base] += exp
-            else:
-                exponents[base] -= exp
-
-            return remainder
-
-        new = cls()
-        add = True
-        while len(expr) >= 1:
-            if expr[0] == '(':
-                # Recurse into the subexpression:
-                subexpr, expr = get_group(expr)
-                if add:
-                    new += cls.fromstr(subexpr)
-                else:
-                    new -= cls.fromstr(subexpr)
-            else:
-                expr = process_expression(expr, new, add)
-
-            # Get the operator for the next loop.
-            if len(expr) >= 1:
-                add = expr[0] == '*'
-                assert add or expr[0] == '/', (
-                    "The operation must be '*' or '/'.")
-                expr = expr[1:]
-                assert expr, "The expression can't end with an operator."
-
-        return new
+        return cls(dict(_parse(expr)))
 
     def __add__(x, y):
         """x.__add__(y) <==> x+y"""
@@ -34,6 +34,10 @@ These modules require that the `SI units`_ are defined in the selected INI_
 files.  `BIPM.ini <BIPM-ini.html>`_ contains those definitions, and it is loaded
 by default.
 
+The units of each module are selected upon the first access to its attributes
+(e.g., ``from natu.groups.length import *``), using an index of the units by
+dimension that is shared by the modules.
+
 Each module can only be reloaded once.\ [#f1]_
 
 
@@ -56,37 +60,104 @@ __license__ = "BSD-compatible (see LICENSE.txt)"
 import sys
 
 from textwrap import fill
-from ..core import DimObject, UnitsModule, Unit
+from types import ModuleType
+from ..core import Unit, Units, UnitsModule
 
 DOC_LINE_LENGTH = 74
 
+
+class _GroupModule(UnitsModule):
+
+    # The class has no docstring since __doc__ is a property.  It is a
+    # :class:`~natu.core.UnitsModule` whose units are selected upon first
+    # access and whose docstring lists the units only when it is read.
+
+    def __init__(self, module, select, heading):
+        """Initialize the module with meta attributes matching those of
+        *module*, a function that returns a dictionary of the units
+        (*select*), and the heading of the list of units in the docstring
+        (*heading*).
+        """
+        UnitsModule.__init__(self, module, {})
+        del self._units, self.__all__ # Created by _select_units()
+        self._select = select
+        self._heading = heading
+
+    def __getattr__(self, name):
+        """Return a unit or attribute matching *name* (a string), selecting
+        the units first if necessary.
+        """
+        if '_units' in self.__dict__:
+            return UnitsModule.__getattr__(self, name)
+        if name.startswith('__') and name != '__all__':
+            # Don't select the units for other special attributes, which are
+            # looked up by the import machinery.
+            raise AttributeError(name + " isn't a valid unit or attribute")
+        self._select_units()
+        return getattr(self, name)
+
+    def _select_units(self):
+        """Select the units and add them to the module.
+        """
+        units = self._select()
+        self._units = Units(units)
+        self.__all__ = list(units)
+
+    def _get_doc(self):
+        """Return the docstring of the module, listing the units.
+        """
+        try:
+            return self.__dict__['_doc']
+        except KeyError:
+            pass
+        units = self._units
+        doc = (self.__dict__['__doc__'] + self._heading
+               + fill(", ".join(sorted(units)), DOC_LINE_LENGTH))
+
+        # Note the prefixable units, if any.
+        prefixable = [symbol for symbol, unit in units.items()
+                      if isinstance(unit, Unit) and unit.prefixable]
+        if prefixable:
+            doc += "\n\nPrefixable subset:\n"
+            doc += fill(", ".join(sorted(prefixable)), DOC_LINE_LENGTH)
+
+        self._doc = doc
+        return doc
+
+    def _set_doc(self, doc):
+        """Replace the docstring of the module.
+        """
+        ModuleType.__setattr__(self, '_doc', doc)
+
+    __doc__ = property(_get_doc, _set_doc)
+
+
 def _update_module(name, units, dimension=None):
-    """Update the module with name *name* (:class`str`) to contain the units in
-    :class:`dict` *units*, optionally filtered to those with
+    """Replace the module with name *name* (:class`str`) by one that contains
+    the units in *units*, optionally filtered to those with
     :class:`~natu.exponents.Exponents` *dimension*.
 
-    If *dimension* is *None*, all units are included.
+    If *dimension* is *None*, *units* is a :class:`dict` of units or a function
+    that returns one, and all of the units are included.  Otherwise, *units*
+    is a :class:`~natu.core.Units` dictionary, and the units with the dimension
+    are looked up using :meth:`~natu.core.Units.by_dimension`.
+
+    The units are selected upon the first access to the module's attributes,
+    and its docstring lists them only when it is read.
     """
     # Retrieve the module.
     module = sys.modules[name]
 
-    # Get the units and note the contents.
+    # Determine how to select the units.
     if dimension is None:
-        module.__doc__ += "\nContents:\n"
+        heading = "\nContents:\n"
+        if callable(units):
+            select = units
+        else:
+            select = lambda: units
     else:
-        units = {symbol: unit for symbol, unit in units.items()
-                 if symbol != 'coherent_relations'
-                 and isinstance(unit, DimObject)
-                 and unit.dimension == dimension}
-        module.__doc__ += "\nDefault contents:\n"
-    module.__doc__ += fill(", ".join(sorted(units)), DOC_LINE_LENGTH)
-
-    # Note the prefixable units, if any.
-    prefixable = [symbol for symbol, unit in units.items()
-                  if isinstance(unit, Unit) and unit.prefixable]
-    if prefixable:
-        module.__doc__ += "\n\nPrefixable subset:\n"
-        module.__doc__ += fill(", ".join(sorted(prefixable)), DOC_LINE_LENGTH)
+        heading = "\nDefault contents:\n"
+        select = lambda: units.by_dimension(dimension)
 
     # Update the module.
-    sys.modules[name] = UnitsModule(module, units)
+    sys.modules[name] = _GroupModule(module, select, heading)
@@ -7,12 +7,18 @@ from . import _update_module
 from ..units import _units
 from ..core import Quantity, Unit
 
-# Constants are quantities but not units.
-units = {symbol: quantity for symbol, quantity in _units.items()
-         if isinstance(quantity, Quantity) and not isinstance(quantity, Unit)}
-try:
-    units.update({'k_A': _units['k_A']}) # Ampere's constant is a ScalarUnit.
-except KeyError:
-    pass
 
-_update_module(__name__, units)
+def _select():
+    """Return a dictionary of the constants."""
+    # Constants are quantities but not units.
+    units = {symbol: quantity for symbol, quantity in _units.items()
+             if isinstance(quantity, Quantity)
+             and not isinstance(quantity, Unit)}
+    try:
+        # Ampere's constant is a ScalarUnit.
+        units.update({'k_A': _units['k_A']})
+    except KeyError:
+        pass
+    return units
+
+_update_module(__name__, _select)
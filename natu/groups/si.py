@@ -9,14 +9,19 @@
 from . import _update_module
 from ..units import _units
 
-# [BIPM2006, Table 1]: SI base units
-# g is included so that it can be used with other prefixes than k.
-units = {symbol: _units[symbol] for symbol in 'm kg g s A K mol cd'.split()}
 
-# [BIPM2006, Table 3]: Coherent derived units in SI with special names and
-# symbols
-units.update({symbol: _units[symbol] for symbol in
-              ('rad sr Hz N Pa J W C V F ohm S Wb T H degC lm lx Bq Gy '
-               'Sv kat'.split())})
+def _select():
+    """Return a dictionary of the SI units."""
+    # [BIPM2006, Table 1]: SI base units
+    # g is included so that it can be used with other prefixes than k.
+    units = {symbol: _units[symbol]
+             for symbol in 'm kg g s A K mol cd'.split()}
 
-_update_module(__name__, units)
+    # [BIPM2006, Table 3]: Coherent derived units in SI with special names and
+    # symbols
+    units.update({symbol: _units[symbol] for symbol in
+                  ('rad sr Hz N Pa J W C V F ohm S Wb T H degC lm lx Bq Gy '
+                   'Sv kat'.split())})
+    return units
+
+_update_module(__name__, _select)
@@ -0,0 +1,957 @@
+#!/usr/bin/python
+"""Contains :class:`MixedQuantityArray`, an array of quantities that may have
+different dimensions (e.g., a state vector of pressures, temperatures, and
+flows), and :class:`QuantityMatrix`, a matrix with a dimension for each row and
+column (e.g., a Jacobian or a covariance matrix)
+
+An array is stored as a structure of arrays rather than as an array of
+:class:`~natu.core.Quantity` instances: a column of values, a matrix of the
+exponents of the base dimensions (one row per item), and the index of each
+item's dimension and display unit in a small table.  Dimension checks,
+products, and comparisons are vectorized over the whole array; the table is
+only updated once per distinct pair of dimensions.
+
+A matrix is stored as an array of values and the dimensions and display units
+of its rows and columns.  Matrix products (:meth:`QuantityMatrix.dot`),
+:func:`einsum`, :func:`solve`, :func:`inv`, and :func:`det` handle the
+dimensions once per axis and leave the numerical work to NumPy_.
+
+This module requires NumPy_.
+
+.. _NumPy: http://numpy.scipy.org/
+"""
+# pylint: disable=I0011, C0103, W0212
+
+from fractions import Fraction
+
+import numpy as np
+
+from . import core
+from .core import DIMENSIONLESS, Quantity
+from ._simplification import _gcd
+
+# Type of the exponents of the base dimensions (scaled to integers)
+_EXPONENT_TYPE = np.int8
+
+# Type used to compute the exponents before they are checked for overflow
+_WIDE_TYPE = np.int32
+
+# (dimension, display unit) pair of a number
+_NUMBER = (DIMENSIONLESS, None)
+
+
+class MixedQuantityArray(object):
+
+    """One-dimensional array of quantities that may have different dimensions
+
+    **Initialization parameters:**
+
+    - *quantities*: Iterable of :class:`~natu.core.Quantity` instances and
+      numbers (which are dimensionless)
+
+    **Properties:**
+
+    - :attr:`dimensions` - List of the dimensions of the items
+
+    - :attr:`dimensionless` - Boolean array that is *True* where the items are
+      dimensionless
+
+    - :attr:`exponents` - Matrix (:class:`numpy.ndarray`) of the exponents of
+      the base dimensions, with a row for each item
+
+    - :attr:`bases` - List of the base dimensions that index the columns of
+      :attr:`exponents`
+
+    The values are available via :func:`natu.core.value`.  The array supports
+    indexing (an item is returned as a quantity, and a slice, index array, or
+    mask is returned as an array), multiplication and division by arrays,
+    quantities, and numbers, powers with scalar exponents, and addition,
+    subtraction, and comparisons with arrays and quantities of the same
+    dimensions (item by item).  The array must be the first term of an
+    addition, subtraction, or comparison with a quantity.  Like the other
+    quantities, the array is immutable.
+
+    **Example:**
+
+    >>> from natu.units import kPa, K, kg, s
+    >>> state = MixedQuantityArray([101.325*kPa, 300*K, 2*kg/s])
+    >>> print(state)
+    [101.325 kPa, 300 K, 2 kg/s]
+    >>> print(state*(2*s))
+    [202.65 kPa*s, 600 K*s, 4 kg]
+    >>> print(state[1:] + MixedQuantityArray([1*K, 1*kg/s]))
+    [301 K, 3 kg/s]
+    >>> state > MixedQuantityArray([100*kPa, 310*K, 1*kg/s])
+    array([ True, False,  True])
+    >>> state + state[::-1]
+    Traceback (most recent call last):
+    ...
+    AssertionError: The quantities must have the same dimension.
+    """
+
+    __slots__ = ('_value', '_exponents', '_scale', '_kinds', '_table')
+
+    # Defer to the reflected operators instead of NumPy's ufuncs.
+    __array_ufunc__ = None
+
+    # Make quantities defer to the reflected operators too (see
+    # natu.core.Quantity.__mul__).
+    _quantities_defer = True
+
+    def __init__(self, quantities):
+        """Initialize the array from an iterable of quantities and numbers.
+
+        See the top-level class documentation.
+        """
+        values = []
+        kinds = []
+        for x in quantities:
+            if isinstance(x, Quantity):
+                values.append(x._value)
+                kinds.append((x._dimension, x._display_unit))
+            else:
+                values.append(x)
+                kinds.append(_NUMBER)
+        self._setup(*self._parts(np.asarray(values, dtype=np.float64), kinds))
+
+    @classmethod
+    def _fromkinds(cls, value, kinds):
+        """Create an array from an array of values and a list of the
+        (dimension, display unit) pairs of the items.
+        """
+        return cls._new(*cls._parts(value, kinds))
+
+    @staticmethod
+    def _parts(value, kinds):
+        """Return the attributes of an array (see :meth:`_setup`) given an
+        array of values and a list of the (dimension, display unit) pairs of
+        the items.
+        """
+        indices = []
+        table = []
+        keys = {}
+        for kind in kinds:
+            dimension, display_unit = kind
+            key = (dimension, None if display_unit is None
+                   else frozenset(display_unit.items()))
+            try:
+                indices.append(keys[key])
+            except KeyError:
+                indices.append(len(table))
+                keys[key] = len(table)
+                table.append(kind)
+        indices = np.asarray(indices, dtype=np.intp)
+        exponents, scale = _table_exponents(table)
+        return value, exponents[indices], scale, indices, table
+
+    def _setup(self, value, exponents, scale, kinds, table):
+        """Set the attributes directly.
+
+        - *value*: Array of the values
+
+        - *exponents*: Matrix of the exponents of the base dimensions, scaled
+          by *scale* to integers
+
+        - *kinds*: Array of the indices of the items in *table*
+
+        - *table*: List of the (dimension, display unit) pairs of the items
+
+             The display unit is *None* for numbers.
+        """
+        self._value = value
+        self._exponents = exponents
+        self._scale = scale
+        self._kinds = kinds
+        self._table = table
+        return self
+
+    @classmethod
+    def _new(cls, *args):
+        """Create an array directly from its attributes (see :meth:`_setup`).
+        """
+        return cls.__new__(cls)._setup(*args)
+
+    # Properties
+    # ----------
+
+    @property
+    def dimensions(self):
+        """List of the dimensions of the items"""
+        table = self._table
+        return [table[kind][0] for kind in self._kinds]
+
+    @property
+    def dimensionless(self):
+        """Boolean array that is *True* where the items are dimensionless"""
+        return ~self._exponents.any(axis=1)
+
+    @property
+    def exponents(self):
+        """Matrix of the exponents of the base dimensions (see :attr:`bases`)
+        """
+        if self._scale == 1:
+            return self._exponents.copy()
+        return self._exponents / float(self._scale)
+
+    @property
+    def bases(self):
+        """List of the base dimensions that index the columns of
+        :attr:`exponents`
+        """
+        return core._BASE_DIMENSIONS[:self._exponents.shape[1]]
+
+    # Container methods
+    # -----------------
+
+    def __len__(self):
+        """Return the number of items."""
+        return len(self._value)
+
+    def __getitem__(self, item):
+        """Return an item as a quantity or a subset as an array."""
+        kinds = self._kinds[item]
+        if isinstance(kinds, np.ndarray):
+            return self._new(self._value[item], self._exponents[item],
+                             self._scale, kinds, self._table)
+        return _item(self._value[item], self._table[kinds])
+
+    def __iter__(self):
+        """Iterate over the items as quantities."""
+        table = self._table
+        for value, kind in zip(self._value, self._kinds):
+            yield _item(value, table[kind])
+
+    def __str__(self):
+        return '[%s]' % ', '.join(str(x) for x in self)
+
+    def __repr__(self):
+        return 'MixedQuantityArray([%s])' % ', '.join(str(x) for x in self)
+
+    # Dimension checks
+    # ----------------
+
+    def same_dimension(self, other):
+        """Return a boolean array that is *True* where the items have the same
+        dimension as those of *other* (another array, a quantity, or a
+        number).
+        """
+        _, exponents, _, _ = self._align(other)
+        return (exponents[0] == exponents[1]).all(axis=1)
+
+    def _align(self, other):
+        """Return the values, the exponents, the scale, and the kinds and
+        table of *other* (another array, a quantity, or a number), with the
+        exponents of both arrays scaled alike and padded to the same number of
+        base dimensions.
+
+        The exponents are returned as a pair (this array's and *other*'s).  If
+        *other* isn't an array, its exponents are a single row, and its kinds
+        are *None*.
+        """
+        if isinstance(other, MixedQuantityArray):
+            value = other._value
+            exponents, scale = other._exponents, other._scale
+            kinds, table = other._kinds, other._table
+        else:
+            if isinstance(other, Quantity):
+                value = other._value
+                kind = (other._dimension, other._display_unit)
+            else:
+                value = other
+                kind = _NUMBER
+            exponents, scale = _table_exponents([kind])
+            kinds, table = None, [kind]
+        new_scale = _lcm(self._scale, scale)
+        width = max(self._exponents.shape[1], exponents.shape[1])
+        return value, (_rescale(self._exponents, new_scale // self._scale,
+                                width),
+                       _rescale(exponents, new_scale // scale, width)), \
+            new_scale, (kinds, table)
+
+    def _check_same(self, other):
+        """Return the values of *other* after checking that its items have the
+        same dimensions as those of this array.
+        """
+        value, exponents, _, _ = self._align(other)
+        assert (exponents[0] == exponents[1]).all(), \
+            "The quantities must have the same dimension."
+        return value
+
+    # Arithmetic
+    # ----------
+
+    def _product(self, other, sign, reverse=False):
+        """Return the product (*sign* = 1) or the quotient (*sign* = -1) of
+        this array and *other*, or of *other* and this array if *reverse* is
+        *True*.
+        """
+        value, (exponents1, exponents2), scale, (kinds, table) = self._align(
+            other)
+        if reverse:
+            exponents = _narrow(exponents2 + sign*exponents1)
+            combine = lambda kind1, kind2: _combine(kind2, kind1, sign)
+            value = value * self._value if sign == 1 else value / self._value
+        else:
+            exponents = _narrow(exponents1 + sign*exponents2)
+            combine = lambda kind1, kind2: _combine(kind1, kind2, sign)
+            value = self._value * value if sign == 1 else self._value / value
+        if kinds is None:
+            # The kinds are unchanged; only the table is.
+            kinds = self._kinds
+            new_table = [combine(kind, table[0]) for kind in self._table]
+        else:
+            # Tabulate each distinct pair of kinds once.
+            n = len(table)
+            pairs, kinds = np.unique(self._kinds*n + kinds,
+                                     return_inverse=True)
+            new_table = [combine(self._table[pair // n], table[pair % n])
+                         for pair in pairs]
+            kinds = kinds.reshape(-1)
+        exponents, scale = _reduce(exponents, scale)
+        return self._new(value, exponents, scale, kinds, new_table)
+
+    def __mul__(self, other):
+        """x.__mul__(y) <==> x*y
+        """
+        return self._product(other, 1)
+
+    def __rmul__(self, other):
+        """x.__rmul__(y) <==> y*x
+        """
+        return self._product(other, 1, reverse=True)
+
+    def __truediv__(self, other):
+        """x.__truediv__(y) <==> x/y
+        """
+        return self._product(other, -1)
+
+    __div__ = __truediv__
+
+    def __rtruediv__(self, other):
+        """x.__rtruediv__(y) <==> y/x
+        """
+        return self._product(other, -1, reverse=True)
+
+    __rdiv__ = __rtruediv__
+
+    def dot(self, other):
+        """Return the inner or matrix product of this array and *other* (an
+        array, a :class:`QuantityMatrix`, or a quantity).
+
+        The terms of the sum must have the same dimension.
+        """
+        return _matmul(self, other)
+
+    __matmul__ = dot
+
+    def __rmatmul__(self, other):
+        """x.__rmatmul__(y) <==> y@x
+        """
+        return _matmul(other, self)
+
+    def __pow__(self, exponent):
+        """x.__pow__(y) <==> x**y
+
+        The exponent must be a dimensionless scalar.
+        """
+        exponent = core.dimensionless_value(exponent)
+        fraction = Fraction(exponent).limit_denominator()
+        scale = self._scale * fraction.denominator
+        exponents, scale = _reduce(_narrow(self._exponents.astype(_WIDE_TYPE)
+                                           * fraction.numerator), scale)
+        table = [(dimension * exponent,
+                  None if display_unit is None else display_unit * exponent)
+                 for dimension, display_unit in self._table]
+        return self._new(self._value ** exponent, exponents, scale,
+                         self._kinds, table)
+
+    def __neg__(self):
+        """x.__neg__() <==> -x
+        """
+        return self._new(-self._value, self._exponents, self._scale,
+                         self._kinds, self._table)
+
+    def __pos__(self):
+        """x.__pos__() <==> +x
+        """
+        return self
+
+    def __abs__(self):
+        """x.__abs__() <==> abs(x)
+        """
+        return self._new(abs(self._value), self._exponents, self._scale,
+                         self._kinds, self._table)
+
+    def __add__(self, other):
+        """x.__add__(y) <==> x+y
+        """
+        return self._new(self._value + self._check_same(other),
+                         self._exponents, self._scale, self._kinds,
+                         self._table)
+
+    def __sub__(self, other):
+        """x.__sub__(y) <==> x-y
+        """
+        return self._new(self._value - self._check_same(other),
+                         self._exponents, self._scale, self._kinds,
+                         self._table)
+
+    # Comparisons
+    # -----------
+
+    def __eq__(self, other):
+        """x.__eq__(y) <==> x==y
+
+        Items with different dimensions are unequal.
+        """
+        return self.same_dimension(other) & (self._value == core.value(other))
+
+    def __ne__(self, other):
+        """x.__ne__(y) <==> x!=y
+        """
+        return ~self.__eq__(other)
+
+    def __lt__(self, other):
+        """x.__lt__(y) <==> x<y
+        """
+        return self._value < self._check_same(other)
+
+    def __le__(self, other):
+        """x.__le__(y) <==> x<=y
+        """
+        return self._value <= self._check_same(other)
+
+    def __gt__(self, other):
+        """x.__gt__(y) <==> x>y
+        """
+        return self._value > self._check_same(other)
+
+    def __ge__(self, other):
+        """x.__ge__(y) <==> x>=y
+        """
+        return self._value >= self._check_same(other)
+
+    __hash__ = None
+
+
+class QuantityMatrix(object):
+
+    """Matrix of quantities with a dimension and display unit for each row and
+    each column
+
+    The dimension of each entry is the product of the dimensions of its row and
+    column, as in a Jacobian, a covariance matrix, or a state-space model.  The
+    values are stored as a single array, so the numerical work (e.g., by
+    :func:`numpy.matmul` or :func:`numpy.linalg.solve`) runs at the speed of
+    NumPy_, and the dimensions are handled once per row and column.
+
+    **Initialization parameters:**
+
+    - *value*: 2-D array of numbers
+
+         Each number is multiplied by the units of its row and column.
+
+    - *rows*: Iterable of the units (or other quantities or numbers) of the
+      rows
+
+    - *cols*: Iterable of the units (or other quantities or numbers) of the
+      columns
+
+    **Properties:**
+
+    - :attr:`shape` - Numbers of rows and columns
+
+    - :attr:`row_dimensions` - List of the dimensions of the rows
+
+    - :attr:`col_dimensions` - List of the dimensions of the columns
+
+    - :attr:`T` - Transposed matrix
+
+    The assignment of the dimensions to the rows and columns isn't unique; a
+    dimension can be moved from all of the rows to all of the columns.
+
+    The matrix supports indexing by row and column (an entry is returned as a
+    quantity, a row or column as a :class:`MixedQuantityArray`, and a
+    submatrix as a matrix), matrix products with matrices, arrays, and
+    quantities (:meth:`dot` or the @ operator), multiplication and division by
+    quantities and numbers, and addition and subtraction of matrices of the
+    same dimensions.  See also :func:`einsum`, :func:`solve`, :func:`inv`, and
+    :func:`det`.
+
+    **Example:**
+
+    A state-space model (*dx/dt* = *A* *x*) with a temperature and a level:
+
+    >>> from natu.units import K, m, s
+    >>> A = QuantityMatrix([[-0.1, 0.5], [0, -0.2]], rows=[K/s, m/s],
+    ...                    cols=[1/K, 1/m])
+    >>> x = MixedQuantityArray([300*K, 2*m])
+    >>> print(A.dot(x))
+    [-29 K/s, -0.4 m/s]
+    >>> print(solve(A, A.dot(x)))
+    [300 K, 2 m]
+    >>> print(A[0, 1])
+    0.5 K/(m*s)
+    """
+
+    __slots__ = ('_value', '_rows', '_cols')
+
+    # Defer to the reflected operators instead of NumPy's ufuncs.
+    __array_ufunc__ = None
+
+    # Make quantities defer to the reflected operators too (see
+    # natu.core.Quantity.__mul__).
+    _quantities_defer = True
+
+    def __init__(self, value, rows, cols):
+        """Initialize the matrix from an array and the units of the rows and
+        columns.
+
+        See the top-level class documentation.
+        """
+        rows = list(rows)
+        cols = list(cols)
+        value = np.array(value, dtype=np.float64)
+        if value.shape != (len(rows), len(cols)):
+            raise ValueError("The shape of the value doesn't match the "
+                             "numbers of rows and columns.")
+        self._value = (value * np.array([core.value(x) for x in rows])[:, None]
+                       * np.array([core.value(x) for x in cols]))
+        self._rows = [_kind(x) for x in rows]
+        self._cols = [_kind(x) for x in cols]
+
+    @classmethod
+    def _new(cls, value, rows, cols):
+        """Create a matrix directly from an array of values and lists of the
+        (dimension, display unit) pairs of the rows and columns.
+        """
+        new = cls.__new__(cls)
+        new._value = value
+        new._rows = rows
+        new._cols = cols
+        return new
+
+    # Properties
+    # ----------
+
+    @property
+    def shape(self):
+        """Numbers of rows and columns"""
+        return self._value.shape
+
+    @property
+    def row_dimensions(self):
+        """List of the dimensions of the rows"""
+        return [dimension for dimension, _ in self._rows]
+
+    @property
+    def col_dimensions(self):
+        """List of the dimensions of the columns"""
+        return [dimension for dimension, _ in self._cols]
+
+    @property
+    def T(self):
+        """Transposed matrix"""
+        return self._new(self._value.T, self._cols, self._rows)
+
+    # Container methods
+    # -----------------
+
+    def __len__(self):
+        """Return the number of rows."""
+        return len(self._rows)
+
+    def __getitem__(self, item):
+        """Return an entry as a quantity, a row or column as an array, or a
+        submatrix as a matrix.
+        """
+        rows, cols = item if isinstance(item, tuple) else (item, slice(None))
+        value = self._value[rows, :][..., cols]
+        rows = _select(self._rows, rows)
+        cols = _select(self._cols, cols)
+        if isinstance(rows, list):
+            if isinstance(cols, list):
+                return self._new(value, rows, cols)
+            return MixedQuantityArray._fromkinds(
+                value, [_combine(kind, cols, 1) for kind in rows])
+        if isinstance(cols, list):
+            return MixedQuantityArray._fromkinds(
+                value, [_combine(rows, kind, 1) for kind in cols])
+        return _item(value, _combine(rows, cols, 1))
+
+    def __str__(self):
+        return '[%s]' % ',\n '.join(
+            '[%s]' % ', '.join(str(_item(value, _combine(row, col, 1)))
+                               for value, col in zip(values, self._cols))
+            for values, row in zip(self._value, self._rows))
+
+    def __repr__(self):
+        return 'QuantityMatrix(%s)' % self
+
+    # Arithmetic
+    # ----------
+
+    def dot(self, other):
+        """Return the matrix product of this matrix and *other* (a matrix, an
+        array, or a quantity).
+        """
+        return _matmul(self, other)
+
+    __matmul__ = dot
+
+    def __rmatmul__(self, other):
+        """x.__rmatmul__(y) <==> y@x
+        """
+        return _matmul(other, self)
+
+    def _scale(self, other, sign):
+        """Return this matrix multiplied (*sign* = 1) or divided (*sign* = -1)
+        by a quantity or number.
+        """
+        if np.ndim(core.value(other)) != 0:
+            return NotImplemented
+        kind = _kind(other)
+        value = (self._value * core.value(other) if sign == 1
+                 else self._value / core.value(other))
+        return self._new(value, [_combine(row, kind, sign)
+                                 for row in self._rows], self._cols)
+
+    def __mul__(self, other):
+        """x.__mul__(y) <==> x*y
+        """
+        return self._scale(other, 1)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        """x.__truediv__(y) <==> x/y
+        """
+        return self._scale(other, -1)
+
+    __div__ = __truediv__
+
+    def __neg__(self):
+        """x.__neg__() <==> -x
+        """
+        return self._new(-self._value, self._rows, self._cols)
+
+    def __pos__(self):
+        """x.__pos__() <==> +x
+        """
+        return self
+
+    def _check_same(self, other):
+        """Return the values of another matrix after checking that its entries
+        have the same dimensions as those of this matrix.
+        """
+        if not isinstance(other, QuantityMatrix):
+            raise TypeError("A matrix can only be added to or subtracted from "
+                            "another matrix.")
+        shift = _uniform([_combine(row1, row2, -1)
+                          for row1, row2 in zip(self._rows, other._rows)])
+        assert shift[0] is _uniform([_combine(col2, col1, -1) for col1, col2
+                                     in zip(self._cols, other._cols)])[0], \
+            "The quantities must have the same dimension."
+        return other._value
+
+    def __add__(self, other):
+        """x.__add__(y) <==> x+y
+        """
+        return self._new(self._value + self._check_same(other), self._rows,
+                         self._cols)
+
+    def __sub__(self, other):
+        """x.__sub__(y) <==> x-y
+        """
+        return self._new(self._value - self._check_same(other), self._rows,
+                         self._cols)
+
+    __hash__ = None
+
+
+def einsum(subscripts, *operands):
+    """Evaluate the Einstein summation convention on matrices, arrays,
+    quantities, and numbers.
+
+    This is :func:`numpy.einsum` (without ellipses), except that the dimensions
+    are determined once per axis.  The terms of each sum must have the same
+    dimension.  The result is a quantity (or a number), a
+    :class:`MixedQuantityArray`, or a :class:`QuantityMatrix`, depending on the
+    number of output axes (up to two).
+
+    **Example:**
+
+    >>> from natu.units import m, s
+    >>> J = QuantityMatrix([[1, 2], [3, 4]], rows=[m, m/s], cols=[1, 1/s])
+    >>> print(einsum('ij,j->i', J, MixedQuantityArray([1, 1*s])))
+    [3 m, 7 m/s]
+    """
+    subscripts = subscripts.replace(' ', '')
+    if '.' in subscripts:
+        raise ValueError("Ellipses aren't supported.")
+    if '->' in subscripts:
+        inputs, output = subscripts.split('->')
+    else:
+        inputs = subscripts
+        labels = inputs.replace(',', '')
+        output = ''.join(sorted(label for label in set(labels)
+                                if labels.count(label) == 1))
+    parts = [_operand(x) for x in operands]
+    constant, axes = _contract(parts, inputs.split(','), output)
+    return _result(np.einsum(subscripts, *[part[0] for part in parts]), axes,
+                   constant)
+
+
+def solve(a, b):
+    """Solve the linear equations *a* *x* = *b* for *x*.
+
+    **Parameters:**
+
+    - *a*: :class:`QuantityMatrix`
+
+    - *b*: :class:`MixedQuantityArray`, :class:`QuantityMatrix`, or a quantity
+      or array
+
+    **Returns:** *x* as a :class:`MixedQuantityArray` or, if *b* is a matrix,
+    a :class:`QuantityMatrix`
+    """
+    value, axes, kind = _operand(b)
+    rows = _expand(axes[0], len(a._rows))
+    shift = _uniform([_combine(_combine(row, kind, 1), row_a, -1)
+                      for row, row_a in zip(rows, a._rows)])
+    value = np.linalg.solve(a._value, value)
+    rows = [_combine(shift, col, -1) for col in a._cols]
+    if len(axes) == 1:
+        return MixedQuantityArray._fromkinds(value, rows)
+    return QuantityMatrix._new(value, rows, _expand(axes[1], value.shape[1]))
+
+
+def inv(a):
+    """Return the inverse of a :class:`QuantityMatrix`.
+
+    The dimensions of the rows of the inverse are the reciprocals of those of
+    the columns of *a*, and vice versa.
+    """
+    return QuantityMatrix._new(np.linalg.inv(a._value),
+                               [_combine(_NUMBER, col, -1) for col in a._cols],
+                               [_combine(_NUMBER, row, -1) for row in a._rows])
+
+
+def det(a):
+    """Return the determinant of a :class:`QuantityMatrix` as a quantity (or a
+    number).
+    """
+    kind = _NUMBER
+    for row_or_col in a._rows + a._cols:
+        kind = _combine(kind, row_or_col, 1)
+    return _item(np.linalg.det(a._value), kind)
+
+
+def _matmul(a, b):
+    """Return the matrix product of two matrices, arrays, or quantities."""
+    parts = [_operand(a), _operand(b)]
+    try:
+        inputs, output = _MATMUL_SUBSCRIPTS[(len(parts[0][1]),
+                                             len(parts[1][1]))]
+    except KeyError:
+        raise ValueError("The operands of a matrix product must have one or "
+                         "two axes.")
+    constant, axes = _contract(parts, inputs, output)
+    return _result(np.matmul(parts[0][0], parts[1][0]), axes, constant)
+
+
+# Subscripts of the matrix product, by the numbers of axes of the operands
+_MATMUL_SUBSCRIPTS = {(2, 2): (('ij', 'jk'), 'ik'),
+                      (2, 1): (('ij', 'j'), 'i'),
+                      (1, 2): (('j', 'jk'), 'k'),
+                      (1, 1): (('j', 'j'), '')}
+
+
+def _operand(x):
+    """Return the value of an operand, the (dimension, display unit) pairs
+    along each of its axes, and the pair that applies to all of its entries.
+
+    The pairs along an axis are *None* if they are all those of a number.
+    """
+    if isinstance(x, QuantityMatrix):
+        return x._value, [x._rows, x._cols], _NUMBER
+    if isinstance(x, MixedQuantityArray):
+        table = x._table
+        return x._value, [[table[kind] for kind in x._kinds]], _NUMBER
+    value = core.value(x)
+    return value, [None] * np.ndim(value), _kind(x)
+
+
+def _contract(parts, inputs, output):
+    """Return the (dimension, display unit) pair that applies to all of the
+    entries of the result of a contraction and the pairs along each of its
+    axes.
+
+    **Parameters:**
+
+    - *parts*: List of the operands as returned by :func:`_operand`
+
+    - *inputs*: List of the subscripts of the operands
+
+    - *output*: Subscripts of the result
+    """
+    constant = _NUMBER
+    labels = {}
+    for (_, axes, kind), subscripts in zip(parts, inputs):
+        if len(subscripts) != len(axes):
+            raise ValueError("The subscripts don't match the axes of the "
+                             "operands.")
+        constant = _combine(constant, kind, 1)
+        for label, kinds in zip(subscripts, axes):
+            previous = labels.get(label)
+            if previous is None:
+                labels[label] = kinds
+            elif kinds is not None:
+                labels[label] = [_combine(kind1, kind2, 1)
+                                 for kind1, kind2 in zip(previous, kinds)]
+    for label, kinds in labels.items():
+        if label not in output and kinds is not None:
+            # The terms of the sum must have the same dimension.
+            constant = _combine(constant, _uniform(kinds), 1)
+    return constant, [labels[label] for label in output]
+
+
+def _result(value, axes, constant):
+    """Return the result of a contraction as a quantity (or a number), an
+    array, or a matrix.
+    """
+    axes = [_expand(kinds, n) for kinds, n in zip(axes, np.shape(value))]
+    if not axes:
+        return _item(value, constant)
+    first = [_combine(kind, constant, 1) for kind in axes[0]]
+    if len(axes) == 1:
+        return MixedQuantityArray._fromkinds(value, first)
+    if len(axes) == 2:
+        return QuantityMatrix._new(value, first, axes[1])
+    raise ValueError("The result can't have more than two axes.")
+
+
+def _kind(x):
+    """Return the (dimension, display unit) pair of a quantity or a number."""
+    if isinstance(x, Quantity):
+        return x._dimension, x._display_unit
+    return _NUMBER
+
+
+def _expand(kinds, n):
+    """Return a list of *n* (dimension, display unit) pairs of numbers if
+    *kinds* is *None* or *kinds* otherwise.
+    """
+    return [_NUMBER] * n if kinds is None else kinds
+
+
+def _select(kinds, index):
+    """Return the (dimension, display unit) pair or a list of the pairs
+    selected by an index of a row or column.
+    """
+    selected = np.arange(len(kinds))[index]
+    if np.ndim(selected):
+        return [kinds[i] for i in selected]
+    return kinds[selected]
+
+
+def _uniform(kinds):
+    """Return the first (dimension, display unit) pair after checking that
+    the pairs have the same dimension.
+    """
+    dimension = kinds[0][0]
+    for kind in kinds:
+        assert kind[0] is dimension, \
+            "The quantities must have the same dimension."
+    return kinds[0]
+
+
+def _item(value, kind):
+    """Return an item with *value* and *kind* as a quantity or a number."""
+    dimension, display_unit = kind
+    if display_unit is None:
+        return value
+    return Quantity.quicknew(value, dimension, display_unit)
+
+
+def _combine(kind1, kind2, sign):
+    """Return the (dimension, display unit) pair of the product (*sign* = 1)
+    or the quotient (*sign* = -1) of two kinds.
+    """
+    dimension1, display_unit1 = kind1
+    dimension2, display_unit2 = kind2
+    if sign == 1:
+        dimension = dimension1 + dimension2
+    else:
+        dimension = dimension1 - dimension2
+    if display_unit2 is None:
+        display_unit = display_unit1
+    elif display_unit1 is None:
+        display_unit = display_unit2 if sign == 1 else -display_unit2
+    elif sign == 1:
+        display_unit = display_unit1 + display_unit2
+    else:
+        display_unit = display_unit1 - display_unit2
+    if display_unit is not None and not dimension:
+        display_unit = None # The product is a number.
+    return dimension, display_unit
+
+
+def _table_exponents(table):
+    """Return the matrix of the exponents of the dimensions of the kinds in a
+    table (one row per kind), scaled to integers, and the scale.
+    """
+    vectors = [dimension._vector for dimension, _ in table]
+    scale = 1
+    for vector in vectors:
+        for exp in vector:
+            denominator = Fraction(exp).limit_denominator().denominator
+            scale = _lcm(scale, denominator)
+    exponents = np.zeros((len(table), len(core._BASE_DIMENSIONS)), _WIDE_TYPE)
+    for i, vector in enumerate(vectors):
+        for j, exp in enumerate(vector):
+            exponents[i, j] = int(round(exp*scale))
+    return _narrow(exponents), scale
+
+
+def _rescale(exponents, factor, width):
+    """Return the exponents multiplied by *factor* (as wide integers) and
+    padded with zeros to *width* columns.
+    """
+    exponents = exponents.astype(_WIDE_TYPE)
+    if factor != 1:
+        exponents *= factor
+    if exponents.shape[1] < width:
+        exponents = np.pad(exponents, ((0, 0),
+                                       (0, width - exponents.shape[1])),
+                           'constant')
+    return exponents
+
+
+def _narrow(exponents):
+    """Return the exponents as *_EXPONENT_TYPE* after checking that they fit.
+    """
+    info = np.iinfo(_EXPONENT_TYPE)
+    if exponents.size and (exponents.max() > info.max
+                           or exponents.min() < info.min):
+        raise OverflowError("The exponents of the dimensions are too large.")
+    return exponents.astype(_EXPONENT_TYPE)
+
+
+def _reduce(exponents, scale):
+    """Return the exponents and the scale divided by their greatest common
+    divisor.
+    """
+    if scale == 1:
+        return exponents, scale
+    divisor = scale
+    for exp in np.unique(exponents):
+        divisor = _gcd(divisor, abs(int(exp))) if exp else divisor
+        if divisor == 1:
+            return exponents, scale
+    return exponents // divisor, scale // divisor
+
+
+def _lcm(a, b):
+    """Return the least common multiple of two positive integers."""
+    return a * b // _gcd(a, b)
@@ -31,8 +31,16 @@ quantity:
 
 - :func:`degrees`, :func:`radians`, :func:`rad2deg`, and :func:`deg2rad`
 
-All other functions are directly imported from :mod:`numpy`.  However, some of
-these need to be adapted (`Issue #7
+All other functions are directly imported from :mod:`numpy`.  The universal
+functions (e.g., :func:`add`, :func:`multiply`, :func:`exp`, and
+:func:`isfinite`) accept quantities via
+:meth:`~natu.core.Quantity.__array_ufunc__`, which checks the dimensions once
+per call according to the rules in :mod:`natu._ufuncs`.  Many other functions
+(e.g., :func:`sum`, :func:`var`, :func:`concatenate`, :func:`gradient`, and
+:func:`interp`) accept quantities via
+:meth:`~natu.core.Quantity.__array_function__` according to the rules in
+:mod:`natu._array_functions`.  Some of the remaining functions still need to be
+adapted (`Issue #7
 <https://github.com/kdavies4/natu/issues/7>`_).
 """
 
@@ -81,43 +89,6 @@ tanh = decor.dimensionless(tanh)
 # The ones as comments are from elsewhere in numpy.
 # Both can be imported from the base of the numpy module.
 
-# Rounding
-# --------
-
-# around
-# round_
-#'rint'
-# fix
-#'floor'
-#'ceil'
-#'trunc'
-
-# Sums, products, differences
-# ---------------------------
-# prod
-# sum
-# nansum
-# cumprod
-# cumsum
-# diff
-# ediff1d
-# gradient
-# cross # should introduce a factor of 1/cyc
-# trapz
-
-# Exponents and logarithms
-# ------------------------
-
-#'exp'
-#'expm1'
-#'exp2'
-#'log'
-#'log10'
-#'log2'
-#'log1p'
-#'logaddexp'
-#'logaddexp2'
-
 # Other special functions
 # -----------------------
 # IO
@@ -125,33 +96,16 @@ tanh = decor.dimensionless(tanh)
 
 # Floating point routines
 # -----------------------
-#'signbit'
-#'copysign'
 #'frexp'
 #'ldexp'
 
 # Arithmetic operations
 # ---------------------
-#'add'
-#'reciprocal'
-#'negative'
-#'multiply'
-#'divide'
-#'power'
-#'subtract'
-#'true_divide'
-#'floor_divide'
-#'fmod'
-#'mod'
 #'modf'
-#'remainder'
 
 # Handling complex numbers
 # ------------------------
 # angle
-# real
-# imag
-#'conj'
 
 # Miscellaneous
 # -------------
@@ -159,48 +113,24 @@ max = decor.copy_props(np.max) # TODO: assert homogeneous
 min = decor.copy_props(np.min) # TODO: assert homogeneous
 abs = decor.copy_props(np.abs)
 
-# convolve
-# clip
 from fractions import Fraction
 sqrt = decor.use_value_raise(np.sqrt, Fraction(1, 2))
-#'square'
-#'absolute'
-#'fabs'
-#'sign'
-#'maximum'
-#'minimum'
-#'fmax'
-#'fmin'
-# nan_to_num
 # real_if_close
-# interp
 
 # Not on webpage:
 #'bitwise_and'  # broken
 #'bitwise_or'  # broken
 #'bitwise_xor'  # broken
-#'conjugate'  # broken
-#'equal'  # works as is
 #'euler_gamma'
 #'frompyfunc'
 #'geterrobj'
-#'greater'
-#'greater_equal'
 #'invert'
-#'isfinite'  # broken
-#'isinf'  # broken
-#'isnan'  # broken
 #'left_shift'
-#'less'
-#'less_equal'
 #'logical_and'
 #'logical_not'
 #'logical_or'
 #'logical_xor'
-#'nextafter'
-#'not_equal'
 #'right_shift'
 #'seterrobj'
-#'spacing'
 
 del decor, np
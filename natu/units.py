@@ -2,8 +2,11 @@
 r"""Module with all units from the `definition files`_ listed in
 :attr:`natu.config.definitions`
 
-This module cannot be reloaded.  This prevents conflicts that could arise if the
-units were redefined with different `base constants <base-ini.html>`_.
+This module cannot be reloaded.  To use units with different `base constants
+<base-ini.html>`_ in the same session, load them into another
+:class:`~natu.core.Units` dictionary (see :meth:`~natu.core.Units.load_ini`).
+Each quantity is simplified and formatted using the dictionary of the units
+that it is derived from.
 
 
 .. _definition files: definitions.html
@@ -2,6 +2,11 @@
 # -*- coding: utf-8 -*-
 """General supporting functions
 
+**Classes:**
+
+- :class:`LRUCache` - Bounded dictionary that evicts the least recently used
+  entry
+
 **Functions:**
 
 - :func:`delayed_exit` - Exit with a message and a delay.
@@ -53,6 +58,133 @@ import time
 
 from glob import glob
 from pkgutil import walk_packages
+from threading import Lock
+
+# Lock for the changes to the order of the entries of the caches (see LRUCache)
+_ORDER_LOCK = Lock()
+
+try:
+    # The C implementation (Python 3.5+), whose operations are atomic
+    from _collections import OrderedDict
+except ImportError:
+    # The Python implementation, whose operations must be serialized if the
+    # dictionary is shared among threads
+    from collections import OrderedDict
+
+    def _move_to_end(entries, key):
+        """Move an existing entry (*key*) of an :class:`OrderedDict`
+        (*entries*) to the end.
+        """
+        with _ORDER_LOCK:
+            entries[key] = entries.pop(key)
+else:
+    _move_to_end = OrderedDict.move_to_end
+
+
+class LRUCache(object):
+
+    """Bounded dictionary that evicts the least recently used entry
+
+    **Initialization parameters:**
+
+    - *maxsize*: Maximum number of entries
+
+         If an entry is added when the cache is full, then the entry that was
+         least recently accessed or added is removed.
+
+    **Attributes:**
+
+    - *hits*: Number of successful lookups
+
+    - *misses*: Number of failed lookups
+
+         The counters are only for diagnostics.  They aren't locked, so they
+         may undercount if the cache is shared among threads.
+
+    The cache can be shared among threads.  Additions, evictions, and clearing
+    are serialized by a lock.  A lookup also moves the entry to the end of the
+    underlying :class:`~collections.OrderedDict`.  With its C implementation
+    (Python 3.5+), that is atomic under the global interpreter lock, so a
+    lookup takes no lock; with the Python implementation (e.g., Python 2), it
+    is serialized by the same lock.  Either way, a race between threads can at
+    worst evict an entry early (causing it to be computed again) or miscount a
+    hit or miss; it never raises an error or corrupts the cache.  The cache
+    doesn't know how its entries are computed, so a thread may add an entry
+    that was computed before the cache was cleared.  Owners that invalidate
+    the cache (e.g., :class:`~natu.core.Units`) must add entries under the
+    same lock that they clear it under and check that the inputs haven't
+    changed.
+
+    **Example:**
+
+    >>> cache = LRUCache(2)
+    >>> cache['a'] = 1
+    >>> cache['b'] = 2
+    >>> cache['a']
+    1
+    >>> cache['c'] = 3  # Evicts 'b'
+    >>> cache['b']
+    Traceback (most recent call last):
+    ...
+    KeyError: 'b'
+    >>> cache
+    LRUCache(maxsize=2, size=2, hits=1, misses=1)
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __getitem__(self, key):
+        """Return the entry for *key* and mark it as the most recently used.
+
+        Raise a :class:`KeyError` if there is no such entry.
+        """
+        entries = self._entries
+        try:
+            value = entries[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        try:
+            _move_to_end(entries, key)
+        except KeyError:
+            pass  # Evicted by another thread meanwhile
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        """Add or replace the entry for *key*, evicting the least recently used
+        entry if necessary.
+        """
+        entries = self._entries
+        with _ORDER_LOCK:
+            entries.pop(key, None)
+            entries[key] = value
+            while len(entries) > self.maxsize:
+                try:
+                    entries.popitem(last=False)
+                except KeyError:
+                    break  # Emptied by another thread meanwhile
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __repr__(self):
+        return ("LRUCache(maxsize=%s, size=%i, hits=%i, misses=%i)"
+                % (self.maxsize, len(self), self.hits, self.misses))
+
+    def clear(self):
+        """Remove all of the entries (but keep the counts of hits and misses).
+        """
+        with _ORDER_LOCK:
+            self._entries.clear()
+
 
 def delayed_exit(message="Exiting...", t=0.5):
     """Exit with a message (*message*) and a delay of *t* seconds.
@@ -257,15 +389,19 @@ def multiglob(pathnames, extensions={'*.*'}):
      '...natu/config/derived.ini',
      '...natu/groups/conductance.py',
      '...natu/groups/dimensionless.py',
-     '...natu/groups/magnetic_flux_density.py'}
+     '...natu/groups/magnetic_flux_density.py',
+     '...natu/mixed.py'}
 
     .. testcleanup::
-        >>> sorted(multiglob([join(dname, '*d*'), join(dname, '*/*d*')], {'*.py'})) # doctest: +ELLIPSIS
+        >>> pathnames = [join(dname, '*d*'), join(dname, '*/*d*')]
+        >>> sorted(multiglob(pathnames, {'*.py'})
+        ...        ) # doctest: +ELLIPSIS +NORMALIZE_WHITESPACE
         ['...natu/_decorators.py',
          '...natu/config/derived.ini',
          '...natu/groups/conductance.py',
          '...natu/groups/dimensionless.py',
-         '...natu/groups/magnetic_flux_density.py']
+         '...natu/groups/magnetic_flux_density.py',
+         '...natu/mixed.py']
     """
     fnames = set()
     for pathname in flatten_list(pathnames):